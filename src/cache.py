@@ -0,0 +1,98 @@
+"""
+Response Cache
+
+A small thread-safe least-frequently-used cache for LLM responses.
+Prompts that recur (retries, re-investigated incidents, common error
+templates) stay cached, while one-off prompts are the first to go.
+"""
+
+import threading
+from typing import Dict, Generic, Hashable, Optional, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LFUCache(Generic[K, V]):
+    """
+    Least-frequently-used cache with O(1) get and put.
+
+    Entries are grouped by hit count; when full, the entry with the fewest
+    hits is evicted, oldest first among ties. All operations take a lock,
+    since graph nodes may run on worker threads.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        Initialise the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+        """
+        self.maxsize = maxsize
+        self._values: Dict[K, V] = {}
+        self._counts: Dict[K, int] = {}
+        # count -> keys with that count, in insertion order (dicts as ordered sets)
+        self._buckets: Dict[int, Dict[K, None]] = {}
+        self._min_count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _touch(self, key: K):
+        """Move a key to the next hit-count bucket."""
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, {})[key] = None
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Return the cached value for key, or None if absent.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, counting the hit, or None
+        """
+        with self._lock:
+            if key not in self._values:
+                return None
+            self._touch(key)
+            return self._values[key]
+
+    def put(self, key: K, value: V):
+        """
+        Store a value, evicting the least frequently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if key in self._values:
+                self._values[key] = value
+                self._touch(key)
+                return
+            if len(self._values) >= self.maxsize:
+                bucket = self._buckets[self._min_count]
+                evicted = next(iter(bucket))
+                del bucket[evicted]
+                if not bucket:
+                    del self._buckets[self._min_count]
+                del self._values[evicted]
+                del self._counts[evicted]
+            self._values[key] = value
+            self._counts[key] = 1
+            self._buckets.setdefault(1, {})[key] = None
+            self._min_count = 1
@@ -5,21 +5,40 @@ Defines the LangGraph workflow that orchestrates the incident response agent.
 This is where the state machine is constructed with nodes and edges.
 """
 
-from typing import Optional
-from langgraph.graph import StateGraph, END
+import os
+import sys
+import asyncio
+import contextlib
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from .state import AgentState, create_initial_state
-from .nodes import NodeFactory, should_continue_research, check_solution_confidence
+from .nodes import (
+    NodeFactory,
+    route_entry,
+    should_continue_research,
+    check_solution_confidence,
+    diagnosis_cache_key,
+    audit_cache_key,
+)
 from .llm import BaseLLM, get_llm
 from .tools import TavilySearchTool, FileReaderTool
 
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+
+
+# Seconds a cached node result stays valid
+NODE_CACHE_TTL = 3600
+
 
 def create_incident_responder_graph(
     llm: Optional[BaseLLM] = None,
     search_tool: Optional[TavilySearchTool] = None,
     file_tool: Optional[FileReaderTool] = None,
-    verbose: bool = True
-) -> StateGraph:
+    verbose: bool = True,
+    enable_human_approval: bool = True
+) -> "StateGraph":
     """
     Create the incident responder workflow graph.
     
@@ -35,14 +54,15 @@ def create_incident_responder_graph(
     │ Diagnostician│ ──► Analyse error, categorise, generate search queries
     └──────┬──────┘
            │
-           ▼
+           ├──────────────────────┐   (run in parallel)
+           ▼                      ▼
     ┌─────────────┐     ┌────────────────┐
-    │ Webscraper  │ ◄───┤ Loop back if   │
-    └──────┬──────┘     │ need more info │
-           │            └────────────────┘
+    │ Webscraper  │ ◄─┐ │ Code Collector │ ──► Read files named by diagnosis
+    └──────┬──────┘   │ └────────────────┘
+           │          └── Loop back if need more info
            ▼
     ┌─────────────┐
-    │ Code Auditor│ ──► Examine relevant code files
+    │ Code Auditor│ ──► Examine collected code files
     └──────┬──────┘
            │
            ▼
@@ -52,7 +72,7 @@ def create_incident_responder_graph(
            │            └────────────────┘
            ▼
     ┌─────────────┐
-    │Human Approval│ ──► Optional checkpoint for risky operations
+    │Human Approval│ ──► Optional checkpoint for risky operations (can be disabled)
     └──────┬──────┘
            │
            ▼
@@ -65,11 +85,19 @@ def create_incident_responder_graph(
         search_tool: Tavily search tool instance
         file_tool: File reader tool instance
         verbose: Whether to print progress messages
+        enable_human_approval: Whether to add the human approval checkpoint.
+            When False the node is left out and solutions that would need
+            approval finish directly (still flagged in the final state).
         
     Returns:
         A compiled LangGraph workflow ready to execute
     """
     
+    # LangGraph is imported here rather than at module level: it dominates
+    # import time, and callers that never build a graph shouldn't pay for it
+    from langgraph.graph import StateGraph, END
+    from langgraph.types import CachePolicy
+    
     # Create node factory with dependencies
     factory = NodeFactory(
         llm=llm,
@@ -85,24 +113,45 @@ def create_incident_responder_graph(
     # ADD NODES
     # ==========================================================================
     
-    workflow.add_node("diagnose", factory.diagnostician)
+    # Diagnose and audit are cached: a byte-identical error log (or identical
+    # audit inputs) replays the previous result instead of calling the LLM
+    workflow.add_node(
+        "diagnose",
+        factory.diagnostician,
+        cache_policy=CachePolicy(key_func=diagnosis_cache_key, ttl=NODE_CACHE_TTL)
+    )
     workflow.add_node("research", factory.webscraper)
-    workflow.add_node("audit", factory.code_auditor)
+    workflow.add_node("collect_code", factory.code_collector)
+    workflow.add_node(
+        "audit",
+        factory.code_auditor,
+        cache_policy=CachePolicy(key_func=audit_cache_key, ttl=NODE_CACHE_TTL)
+    )
     workflow.add_node("solve", factory.solver)
-    workflow.add_node("human_approval", factory.human_approval)
+    if enable_human_approval:
+        workflow.add_node("human_approval", factory.human_approval)
     
     # ==========================================================================
     # SET ENTRY POINT
     # ==========================================================================
     
-    workflow.set_entry_point("diagnose")
+    # Fresh runs start at the diagnostician; batch-diagnosed runs skip it
+    workflow.set_conditional_entry_point(
+        route_entry,
+        ["diagnose", "research", "collect_code"]
+    )
     
     # ==========================================================================
     # ADD EDGES (The Control Flow)
     # ==========================================================================
     
-    # Diagnosis always leads to research
+    # Diagnosis fans out: web research and file collection only depend on the
+    # diagnosis, so they run in the same superstep and their latencies overlap
     workflow.add_edge("diagnose", "research")
+    workflow.add_edge("diagnose", "collect_code")
+    
+    # Collected files stay in state for the auditor (and any refinement passes)
+    workflow.add_edge("collect_code", END)
     
     # Research can loop back to itself or proceed to audit
     workflow.add_conditional_edges(
@@ -123,28 +172,103 @@ def create_incident_responder_graph(
         check_solution_confidence,
         {
             "refine": "research",        # Low confidence → more research
-            "approve": "human_approval", # Needs human approval
+            # Needs human approval (or finish, if the checkpoint is disabled)
+            "approve": "human_approval" if enable_human_approval else END,
             "end": END                   # Confident solution → finish
         }
     )
     
     # Human approval leads to end
-    workflow.add_edge("human_approval", END)
+    if enable_human_approval:
+        workflow.add_edge("human_approval", END)
     
     return workflow
 
 
-def compile_graph(workflow: StateGraph):
+def compile_graph(workflow: "StateGraph"):
     """
     Compile the workflow graph into an executable application.
     
+    The compiled graph gets an in-memory cache that backs the node-level
+    cache policies set in create_incident_responder_graph.
+    
     Args:
         workflow: The StateGraph to compile
         
     Returns:
         A compiled graph ready for execution
     """
-    return workflow.compile()
+    from langgraph.cache.memory import InMemoryCache
+    
+    return workflow.compile(cache=InMemoryCache())
+
+
+# Environment variable holding each LLM provider's API key
+_LLM_KEY_ENV = {
+    "gemini": "GOOGLE_API_KEY"
+}
+
+
+@lru_cache(maxsize=8)
+def _build_app(
+    components: Tuple[Callable[..., BaseLLM], Callable[..., Any], Callable[..., Any]],
+    llm_provider: str,
+    llm_model: Optional[str],
+    llm_api_key: Optional[str],
+    base_directory: str,
+    tavily_api_key: Optional[str],
+    verbose: bool,
+    enable_human_approval: bool = True
+):
+    """
+    Build and compile the workflow for one responder configuration.
+    
+    Cached per process: responders that share a configuration reuse the same
+    compiled graph, LLM, and tools (and so the node cache) instead of
+    rebuilding, validating, and compiling the graph each time.
+    
+    The key covers everything the built objects capture: the constructors
+    used to build the LLM and tools (so an app built while they are patched
+    is never handed to a later responder) and the resolved API keys (so
+    changing a key in the environment builds a fresh app). Use
+    clear_app_cache() to drop all cached apps.
+    
+    Args:
+        components: (LLM factory, search tool class, file tool class)
+    
+    Returns:
+        Tuple of (compiled app, llm, search tool, file tool)
+    """
+    make_llm, search_tool_cls, file_tool_cls = components
+    
+    llm_kwargs = {}
+    if llm_model:
+        llm_kwargs["model"] = llm_model
+    if llm_api_key:
+        llm_kwargs["api_key"] = llm_api_key
+    llm = make_llm(llm_provider, **llm_kwargs)
+    
+    search_tool = search_tool_cls(api_key=tavily_api_key)
+    file_tool = file_tool_cls(base_directory=base_directory)
+    
+    workflow = create_incident_responder_graph(
+        llm=llm,
+        search_tool=search_tool,
+        file_tool=file_tool,
+        verbose=verbose,
+        enable_human_approval=enable_human_approval
+    )
+    return compile_graph(workflow), llm, search_tool, file_tool
+
+
+def clear_app_cache():
+    """
+    Drop every cached compiled app, with its LLM, tools, and node cache.
+    
+    Responders created afterwards build fresh instances, e.g. after
+    rotating API keys or between tests that patch the constructors.
+    """
+    _build_app.cache_clear()
 
 
 class IncidentResponder:
@@ -161,7 +285,8 @@ class IncidentResponder:
         llm_model: Optional[str] = None,
         base_directory: Optional[str] = None,
         tavily_api_key: Optional[str] = None,
-        verbose: bool = True
+        verbose: bool = True,
+        enable_human_approval: bool = True
     ):
         """
         Initialise the incident responder.
@@ -172,47 +297,47 @@ class IncidentResponder:
             base_directory: Root directory for file operations
             tavily_api_key: API key for Tavily search
             verbose: Whether to print progress messages
+            enable_human_approval: Whether to route risky solutions through
+                the human approval checkpoint
         """
-        # Initialise LLM
-        llm_kwargs = {}
-        if llm_model:
-            llm_kwargs["model"] = llm_model
-        self.llm = get_llm(llm_provider, **llm_kwargs)
-        
-        # Initialise tools
-        self.search_tool = TavilySearchTool(api_key=tavily_api_key)
-        self.file_tool = FileReaderTool(base_directory=base_directory)
-        
-        self.verbose = verbose
-        
-        # Build and compile the graph
-        self.workflow = create_incident_responder_graph(
-            llm=self.llm,
-            search_tool=self.search_tool,
-            file_tool=self.file_tool,
-            verbose=verbose
+        # Build (or reuse) the compiled graph for this configuration. Unset
+        # values are resolved here (the current directory, API keys from the
+        # environment) so they are part of the cache key.
+        llm_key_env = _LLM_KEY_ENV.get(llm_provider)
+        self.app, self.llm, self.search_tool, self.file_tool = _build_app(
+            (get_llm, TavilySearchTool, FileReaderTool),
+            llm_provider,
+            llm_model,
+            os.getenv(llm_key_env) if llm_key_env else None,
+            base_directory or os.getcwd(),
+            tavily_api_key or os.getenv("TAVILY_API_KEY"),
+            verbose,
+            enable_human_approval
         )
-        self.app = compile_graph(self.workflow)
+        self.workflow = self.app.builder
+        self.verbose = verbose
     
     def _truncate_at_newline(self, text: str, max_chars: int) -> str:
         """
         Truncate text at the next newline after max_chars, or return full text if short.
         
-        This produces cleaner output than cutting mid-sentence.
+        This produces cleaner output than cutting mid-sentence. Both newline
+        searches are bounded to the window that can be used, so the cost does
+        not grow with the length of the text.
         """
         if len(text) <= max_chars:
             return text
         
-        # Find the next newline after max_chars
-        next_newline = text.find('\n', max_chars)
+        # Find the next newline within a reasonable distance after max_chars
+        next_newline = text.find('\n', max_chars, max_chars + 100)
         
-        if next_newline != -1 and next_newline < max_chars + 100:
+        if next_newline != -1:
             # Found a newline within reasonable distance, cut there
             return text[:next_newline] + "\n  ..."
         else:
-            # No newline nearby, find the last complete line before max_chars
-            last_newline = text.rfind('\n', 0, max_chars)
-            if last_newline > max_chars // 2:
+            # No newline nearby, find the last complete line in the second half
+            last_newline = text.rfind('\n', max_chars // 2 + 1, max_chars)
+            if last_newline != -1:
                 return text[:last_newline] + "\n  ..."
             else:
                 # No good newline, just cut at max_chars
@@ -236,10 +361,7 @@ class IncidentResponder:
         )
         
         if self.verbose:
-            print("\n" + "="*60)
-            print("INCIDENT RESPONDER AGENT STARTING")
-            print("="*60)
-            print(f"\nInput Error Log:\n{self._truncate_at_newline(error_log, 400)}")
+            self._print_header(error_log)
         
         # Execute the workflow
         try:
@@ -250,32 +372,224 @@ class IncidentResponder:
             raise
         
         if self.verbose:
-            self._print_summary(final_state)
+            self.print_summary(final_state)
+        
+        return final_state
+    
+    async def ainvestigate(self, error_log: str, max_iterations: int = 3) -> AgentState:
+        """
+        Async counterpart of investigate().
+        
+        The graph runs on the event loop via ainvoke; blocking node work is
+        dispatched to worker threads, so the caller's loop stays responsive.
+        
+        Args:
+            error_log: The error message or stack trace to investigate
+            max_iterations: Maximum research iterations before concluding
+            
+        Returns:
+            The final AgentState with the investigation results
+        """
+        initial_state = create_initial_state(
+            error_log=error_log,
+            max_iterations=max_iterations
+        )
+        
+        if self.verbose:
+            self._print_header(error_log)
+        
+        return await self._arun(initial_state)
+    
+    async def _arun(self, initial_state: AgentState) -> AgentState:
+        """Run the graph from initial_state and print the summary."""
+        try:
+            final_state = await self.app.ainvoke(initial_state)
+        except Exception as e:
+            if self.verbose:
+                print(f"\nAgent encountered an error: {e}")
+            raise
+        
+        if self.verbose:
+            self.print_summary(final_state)
         
         return final_state
     
-    def _print_summary(self, state: AgentState):
-        """Print a summary of the investigation results."""
-        print("\n" + "="*60)
-        print("INVESTIGATION COMPLETE")
-        print("="*60)
+    async def ainvestigate_stream(
+        self,
+        error_log: str,
+        max_iterations: int = 3
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Investigate an error, yielding each node's update as it completes.
+        
+        Unlike ainvestigate(), which returns only once the graph reaches END,
+        this surfaces progress per superstep, so callers can show the
+        diagnosis while research and the audit are still running.
+        
+        Args:
+            error_log: The error message or stack trace to investigate
+            max_iterations: Maximum research iterations before concluding
+            
+        Yields:
+            (node_name, update) tuples, where update is the partial state
+            the node wrote
+        """
+        initial_state = create_initial_state(
+            error_log=error_log,
+            max_iterations=max_iterations
+        )
+        
+        async for event in self.app.astream(initial_state, stream_mode="updates"):
+            for node_name, update in event.items():
+                # Skip LangGraph bookkeeping entries such as __metadata__
+                if node_name.startswith("__"):
+                    continue
+                yield node_name, update or {}
+    
+    async def ainvestigate_many(
+        self,
+        error_logs: List[str],
+        max_iterations: int = 3,
+        concurrency_limit: int = 8
+    ) -> List[AgentState]:
+        """
+        Investigate several errors concurrently.
+        
+        Investigations are I/O-bound on the LLM and search APIs, so running
+        them together costs roughly the slowest one rather than the sum. All
+        of them share this responder's LLM client and compiled graph.
+        
+        Args:
+            error_logs: The error messages or stack traces to investigate
+            max_iterations: Maximum research iterations per investigation
+            concurrency_limit: Maximum investigations in flight at once
+                (keeps bursts within provider rate limits)
+            
+        Returns:
+            The final AgentStates, in the same order as error_logs
+        """
+        semaphore = asyncio.Semaphore(concurrency_limit)
         
-        print(f"\nError Type: {state.get('error_type', 'unknown')}")
-        print(f"Solution Confidence: {state.get('solution_confidence', 0):.0%}")
-        print(f"Research Iterations: {state.get('iterations', 0)}")
+        async def run(error_log: str) -> AgentState:
+            async with semaphore:
+                return await self.ainvestigate(error_log, max_iterations=max_iterations)
+        
+        return list(await asyncio.gather(*(run(log) for log in error_logs)))
+    
+    def investigate_many(
+        self,
+        error_logs: List[str],
+        max_iterations: int = 3,
+        concurrency_limit: int = 8
+    ) -> List[AgentState]:
+        """
+        Blocking wrapper around ainvestigate_many().
+        
+        Must not be called from a running event loop; await
+        ainvestigate_many() there instead.
+        """
+        return asyncio.run(
+            self.ainvestigate_many(
+                error_logs,
+                max_iterations=max_iterations,
+                concurrency_limit=concurrency_limit
+            )
+        )
+    
+    def investigate_batch(
+        self,
+        error_logs: List[str],
+        max_iterations: int = 3,
+        concurrency_limit: int = 8
+    ) -> List[AgentState]:
+        """
+        Investigate several errors, diagnosing them all in one LLM call.
+        
+        The diagnoses come from a single batched prompt rather than one call
+        per log. Each pre-diagnosed state then enters the graph after the
+        diagnostician, and the investigations run concurrently as in
+        investigate_many().
+        
+        Must not be called from a running event loop.
+        
+        Args:
+            error_logs: The error messages or stack traces to investigate
+            max_iterations: Maximum research iterations per investigation
+            concurrency_limit: Maximum investigations in flight at once
+            
+        Returns:
+            The final AgentStates, in the same order as error_logs
+        """
+        factory = NodeFactory(
+            llm=self.llm,
+            search_tool=self.search_tool,
+            file_tool=self.file_tool,
+            verbose=self.verbose
+        )
+        
+        diagnoses = factory.diagnose_batch(error_logs, max_iterations=max_iterations)
+        
+        initial_states = []
+        for error_log, diagnosis in zip(error_logs, diagnoses):
+            state = create_initial_state(error_log=error_log, max_iterations=max_iterations)
+            state.update(diagnosis)
+            initial_states.append(state)
+        
+        async def run_all() -> List[AgentState]:
+            semaphore = asyncio.Semaphore(concurrency_limit)
+            
+            async def run(state: AgentState) -> AgentState:
+                async with semaphore:
+                    return await self._arun(state)
+            
+            return list(await asyncio.gather(*(run(state) for state in initial_states)))
+        
+        return asyncio.run(run_all())
+    
+    def _print_header(self, error_log: str):
+        """Print the banner shown when an investigation starts."""
+        rule = "=" * 60
+        write = sys.stdout.write
+        write(f"\n{rule}\nINCIDENT RESPONDER AGENT STARTING\n{rule}\n")
+        # Write the preview as its own chunk rather than copying it into an
+        # f-string; short logs are passed through without any slicing
+        write("\nInput Error Log:\n")
+        write(self._truncate_at_newline(error_log, 400))
+        write("\n")
+    
+    def print_summary(self, state: AgentState):
+        """Print a summary of the investigation results (e.g. a cached one)."""
+        # Read every field once up front
+        get = state.get
+        error_type = get("error_type", "unknown")
+        confidence = get("solution_confidence", 0)
+        iterations = get("iterations", 0)
+        solution = get("proposed_solution", "No solution generated")
+        needs_approval = get("needs_human_approval")
+        
+        # Collect the lines and emit them with a single write
+        out = [
+            "\n" + "="*60,
+            "INVESTIGATION COMPLETE",
+            "="*60,
+            f"\nError Type: {error_type}",
+            f"Solution Confidence: {confidence:.0%}",
+            f"Research Iterations: {iterations}",
+        ]
         
         # Show brief solution preview
-        solution = state.get("proposed_solution", "No solution generated")
         preview = self._truncate_at_newline(solution, 200)
-        print(f"\nSolution Preview:\n{preview}")
+        out.append(f"\nSolution Preview:\n{preview}")
         
-        if state.get("needs_human_approval"):
-            print("\n[!] HUMAN APPROVAL REQUIRED")
-            print(f"    Reason: {state.get('pending_action', 'No details')}")
+        if needs_approval:
+            out.append("\n[!] HUMAN APPROVAL REQUIRED")
+            out.append(f"    Reason: {get('pending_action', 'No details')}")
         
-        print("\n" + "="*60)
-        print("Full details will be saved to the incident report.")
-        print("="*60)
+        out.append("\n" + "="*60)
+        out.append("Full details will be saved to the incident report.")
+        out.append("="*60)
+        
+        sys.stdout.write("\n".join(out) + "\n")
     
     def generate_solution_explanation(self, state: AgentState):
         """
@@ -292,21 +606,96 @@ class IncidentResponder:
         """
         from . import prompts
         
-        # Format solution steps
-        steps = state.get('solution_steps', [])
-        steps_text = "\n".join(f"- {s}" for s in steps) if steps else "No steps provided"
-        
-        # Build prompt using template from prompts.py
-        prompt = prompts.EXPLANATION_PROMPT.format(
-            error_type=state.get('error_type', 'unknown'),
-            error_summary=state.get('error_summary', 'N/A'),
-            proposed_solution=state.get('proposed_solution', 'N/A'),
-            solution_steps=steps_text
-        )
+        prompt = self._explanation_prompt(state)
         
         # Yield chunks from the LLM stream
         for chunk in self.llm.generate_stream(prompt, prompts.EXPLANATION_SYSTEM):
             yield chunk
+    
+    async def agenerate_solution_explanation(self, state: AgentState, buffer_size: int = 32):
+        """
+        Async generator that yields chunks of the solution explanation.
+        
+        A producer task reads the LLM stream into a bounded queue while the
+        caller consumes it, so network reads run ahead of a slow consumer
+        (e.g. a WebSocket) by at most buffer_size chunks before pausing.
+        
+        Args:
+            state: The completed investigation state
+            buffer_size: Maximum chunks buffered ahead of the consumer
+            
+        Yields:
+            Text chunks as they're generated by the LLM
+        """
+        from . import prompts
+        
+        prompt = self._explanation_prompt(state)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        done = object()
+        
+        async def produce():
+            try:
+                async for chunk in self.llm.agenerate_stream(prompt, prompts.EXPLANATION_SYSTEM):
+                    await queue.put(chunk)
+            except Exception as e:
+                # Hand the failure to the consumer instead of leaving it waiting
+                await queue.put(e)
+                return
+            await queue.put(done)
+        
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Wait for the cancelled producer so an early exit by the consumer
+            # doesn't leave a pending task behind
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+    
+    def _explanation_prompt(self, state: AgentState) -> str:
+        """Build the explanation prompt for a completed investigation."""
+        return _build_explanation_prompt(
+            state.get('error_type', 'unknown'),
+            state.get('error_summary', 'N/A'),
+            state.get('proposed_solution', 'N/A'),
+            # Steps are rendered with str() anyway; as strings they're hashable
+            tuple(str(s) for s in state.get('solution_steps', []))
+        )
+
+
+@lru_cache(maxsize=64)
+def _build_explanation_prompt(
+    error_type: str,
+    error_summary: str,
+    proposed_solution: str,
+    steps: tuple
+) -> str:
+    """
+    Format the explanation prompt, memoised on its inputs.
+    
+    Re-requesting an explanation for the same investigation (e.g. a client
+    reconnecting mid-stream) reuses the formatted prompt.
+    """
+    from . import prompts
+    
+    # Format solution steps
+    steps_text = "\n".join(f"- {s}" for s in steps) if steps else "No steps provided"
+    
+    # Build prompt using template from prompts.py
+    return prompts.render(
+        prompts.EXPLANATION_PROMPT,
+        error_type=error_type,
+        error_summary=error_summary,
+        proposed_solution=proposed_solution,
+        solution_steps=steps_text
+    )
 
 
 def quick_investigate(error_log: str, **kwargs) -> AgentState:
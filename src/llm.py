@@ -2,14 +2,22 @@
 LLM Interface
 
 Provides an interface for interacting with Google Gemini.
-Supports both blocking and streaming generation.
+Supports blocking, streaming, and async generation.
 """
 
 import os
-from typing import Optional, Iterator
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Iterator, AsyncIterator
 from abc import ABC, abstractmethod
 
 
+# Process-wide genai clients, keyed by API key
+_CLIENT_CACHE: Dict[str, Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
 class BaseLLM(ABC):
     """Abstract base class for LLM providers."""
     
@@ -22,6 +30,48 @@ class BaseLLM(ABC):
     def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
         """Generate a streaming response from the LLM."""
         pass
+    
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Generate a response without blocking the event loop.
+        
+        Providers with a native async client should override this; the
+        default runs the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt)
+    
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a streaming response without blocking the event loop.
+        
+        The default pulls each chunk from the blocking stream in a worker thread.
+        """
+        chunks = iter(self.generate_stream(prompt, system_prompt))
+        done = object()
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, done)
+            if chunk is done:
+                break
+            yield chunk
+
+
+@lru_cache(maxsize=32)
+def _generation_config(system_prompt: Optional[str]):
+    """
+    Build the Gemini request config for a system prompt, once per prompt.
+    
+    Sending the system prompt as a system_instruction (rather than pasting it
+    in front of the user prompt) keeps it an identical, separate prefix that
+    the backend can cache across calls.
+    """
+    if not system_prompt:
+        return None
+    from google.genai import types
+    return types.GenerateContentConfig(system_instruction=system_prompt)
 
 
 class GeminiLLM(BaseLLM):
@@ -40,23 +90,27 @@ class GeminiLLM(BaseLLM):
         if self._client is None:
             if not self.api_key:
                 raise ValueError("Google API key not found. Set GOOGLE_API_KEY environment variable.")
-            try:
-                from google import genai
-                self._client = genai.Client(api_key=self.api_key)
-            except ImportError:
-                raise ImportError("google-genai package not installed. Run: pip install google-genai")
+            # Instances with the same key share one client (and its pooled
+            # connections), so new instances skip the TCP/TLS setup
+            with _CLIENT_LOCK:
+                client = _CLIENT_CACHE.get(self.api_key)
+                if client is None:
+                    try:
+                        from google import genai
+                        client = genai.Client(api_key=self.api_key)
+                    except ImportError:
+                        raise ImportError("google-genai package not installed. Run: pip install google-genai")
+                    _CLIENT_CACHE[self.api_key] = client
+            self._client = client
         return self._client
     
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         client = self._get_client()
         
-        full_prompt = prompt
-        if system_prompt:
-            full_prompt = f"{system_prompt}\n\n{prompt}"
-            
         response = client.models.generate_content(
             model=self.model,
-            contents=full_prompt
+            contents=prompt,
+            config=_generation_config(system_prompt)
         )
         return response.text
     
@@ -75,13 +129,45 @@ class GeminiLLM(BaseLLM):
         """
         client = self._get_client()
         
-        full_prompt = prompt
-        if system_prompt:
-            full_prompt = f"{system_prompt}\n\n{prompt}"
-        
         for chunk in client.models.generate_content_stream(
             model=self.model,
-            contents=full_prompt
+            contents=prompt,
+            config=_generation_config(system_prompt)
+        ):
+            if chunk.text:
+                yield chunk.text
+    
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        client = self._get_client()
+        
+        response = await client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=_generation_config(system_prompt)
+        )
+        return response.text
+    
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async counterpart of generate_stream using the SDK's async client.
+        
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt
+            
+        Yields:
+            Text chunks as they're generated
+        """
+        client = self._get_client()
+        
+        async for chunk in await client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config=_generation_config(system_prompt)
         ):
             if chunk.text:
                 yield chunk.text
@@ -18,24 +18,27 @@ Usage:
 """
 
 import argparse
+import glob
+import hashlib
+import json
+import re
 import sys
 import os
+import tempfile
+import time
 from pathlib import Path
-from typing import Optional
-from dotenv import load_dotenv
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterator, List, Optional
 
-load_dotenv()
+# The agent pulls in LangGraph and the LLM SDKs, so it is imported inside
+# main() once arguments are parsed; --help and argument errors stay fast
+if TYPE_CHECKING:
+    from src.graph import IncidentResponder
+    from src.state import AgentState
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.graph import IncidentResponder
-from src.state import AgentState
-
-
-def print_banner():
-    """Print the application banner."""
-    banner = """
+# Shown when interactive mode starts
+_BANNER = """
 +======================================================================+
 |                                                                      |
 |         DEVOPS INCIDENT RESPONDER AGENT                              |
@@ -44,16 +47,175 @@ def print_banner():
 |         Built with LangGraph | State Machine Architecture            |
 |                                                                      |
 +======================================================================+
+    
+"""
+
+# LLM API key each provider needs
+_REQUIRED_KEYS = {
+    "gemini": "GOOGLE_API_KEY"
+}
+
+# Suggested --max-log-bytes for very large logs. Logs are read in full by
+# default, since the head often holds the root cause and first traceback.
+MAX_LOG_BYTES = 64 * 1024
+
+# Placeholder for report sections with nothing to list
+_NA = ('N/A',)
+
+# AgentState fields written per investigation by --jsonl-output
+REPORT_KEYS = (
+    "error_log",
+    "error_type",
+    "error_summary",
+    "affected_components",
+    "proposed_solution",
+    "solution_confidence",
+    "solution_steps",
+    "code_changes",
+    "needs_human_approval",
+    "pending_action",
+    "iterations",
+    "status",
+)
+
+# Investigation results are cached here, keyed by a normalised error log
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "devir"
+
+# Seconds a cached investigation stays valid; the code it audited may change
+CACHE_TTL = 24 * 3600
+
+# Volatile parts of a log that shouldn't make two otherwise identical errors
+# miss the cache: timestamps, UUIDs / request IDs, container IDs and addresses
+_VOLATILE_PATTERNS = [
+    (re.compile(r"\d{4}[-/]\d{2}[-/]\d{2}[T ][\d:.]+Z?"), "<TS>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<ID>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "<ADDR>"),
+    (re.compile(r"\b[0-9a-f]{12,}\b"), "<ID>"),
+]
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_error_log(error_log: str) -> str:
+    """Strip volatile details from an error log so repeats share a cache key."""
+    for pattern, placeholder in _VOLATILE_PATTERNS:
+        error_log = pattern.sub(placeholder, error_log)
+    return _WHITESPACE.sub(" ", error_log).strip()
+
+
+def read_error_log(path: str, max_bytes: Optional[int] = None) -> str:
+    """
+    Read an error log file, optionally keeping only its last max_bytes.
+    
+    The whole file is read unless max_bytes is set. A larger file is then
+    read from its tail only: the partial first line is dropped, the cut is
+    marked so the LLM knows the log was truncated, and a warning is printed.
+    
+    Args:
+        path: The log file to read
+        max_bytes: Maximum number of bytes to read from the end of the file
+            (None reads the whole file)
+        
+    Returns:
+        The (possibly truncated) log text
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        truncated = max_bytes is not None and size > max_bytes
+        f.seek(size - max_bytes if truncated else 0)
+        data = f.read()
+    
+    if truncated:
+        newline = data.find(b"\n")
+        if newline != -1:
+            data = data[newline + 1:]
+    
+    text = data.decode("utf-8", "replace").replace("\r\n", "\n")
+    if truncated:
+        print(f"Warning: {path} is {size} bytes; only its last {len(data)} are investigated")
+        text = f"[... {size - len(data)} earlier bytes truncated ...]\n" + text
+    return text
+
+
+def cached_investigate(
+    responder: "IncidentResponder",
+    error_log: str,
+    max_iterations: int = 3
+) -> "AgentState":
     """
-    print(banner)
+    Investigate an error, reusing a previous result for the same error.
+    
+    Results are stored as JSON under CACHE_DIR, keyed by the normalised log,
+    the model, max_iterations and the audited code directory, so a repeat
+    run skips every LLM and search call. Entries older than CACHE_TTL and
+    unreadable entries are treated as misses.
+    
+    Args:
+        responder: The responder to run on a cache miss
+        error_log: The error message or stack trace to investigate
+        max_iterations: Maximum research iterations before concluding
+        
+    Returns:
+        The final AgentState, fresh or from the cache
+    """
+    signature = "\0".join([
+        normalise_error_log(error_log),
+        getattr(responder.llm, "model", ""),
+        str(max_iterations),
+        str(Path(responder.file_tool.base_directory).resolve()),
+    ])
+    key = hashlib.blake2b(signature.encode(), digest_size=16).hexdigest()
+    path = CACHE_DIR / f"{key}.json"
+    
+    result = None
+    try:
+        if time.time() - path.stat().st_mtime <= CACHE_TTL:
+            with open(path, encoding="utf-8") as f:
+                result = json.load(f)
+    except (OSError, ValueError):
+        result = None
+    
+    if result is not None:
+        # The entry may come from a log that only normalises to this one
+        result["error_log"] = error_log
+        if responder.verbose:
+            print(f"\nUsing cached investigation: {path}")
+            responder.print_summary(result)
+        return result
+    
+    result = responder.investigate(error_log, max_iterations=max_iterations)
+    
+    # Write to a uniquely named temporary file first, so a crash never leaves
+    # a partial entry and concurrent runs don't write into each other's file
+    tmp_path = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=CACHE_DIR, suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = f.name
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write investigation cache: {e}")
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    
+    return result
 
 
-def get_sample_errors():
-    """Return sample errors for demonstration."""
-    return {
-        "1": {
-            "name": "PostgreSQL Connection Timeout",
-            "error": """
+def print_banner():
+    """Print the application banner."""
+    sys.stdout.write(_BANNER)
+
+
+# Built once at import; read-only so callers can't alter the shared samples
+_SAMPLE_ERRORS = MappingProxyType({
+    "1": MappingProxyType({
+        "name": "PostgreSQL Connection Timeout",
+        "error": """
 Traceback (most recent call last):
   File "/app/database/connection.py", line 45, in connect
     self.conn = psycopg2.connect(**self.config)
@@ -72,10 +234,10 @@ Traceback (most recent call last):
     raise DatabaseConnectionError(f"Failed to connect after {self.retries} retries")
 app.exceptions.DatabaseConnectionError: Failed to connect after 3 retries
 """
-        },
-        "2": {
-            "name": "Docker Container OOMKilled",
-            "error": """
+    }),
+    "2": MappingProxyType({
+        "name": "Docker Container OOMKilled",
+        "error": """
 $ docker logs my-app-container
 [2024-01-15T10:23:45.123Z] Starting application...
 [2024-01-15T10:23:46.456Z] Loading model into memory...
@@ -88,10 +250,10 @@ $ docker stats my-app-container --no-stream
 CONTAINER ID   NAME              CPU %   MEM USAGE / LIMIT     MEM %
 a1b2c3d4e5f6   my-app-container  0.00%   2.048GiB / 2GiB      100.00%
 """
-        },
-        "3": {
-            "name": "Kubernetes Pod CrashLoopBackOff",
-            "error": """
+    }),
+    "3": MappingProxyType({
+        "name": "Kubernetes Pod CrashLoopBackOff",
+        "error": """
 $ kubectl get pods
 NAME                          READY   STATUS             RESTARTS   AGE
 api-server-7d9f8c6b5-xj2m1    0/1     CrashLoopBackOff   5          10m
@@ -112,10 +274,10 @@ Error: Cannot find module '/app/dist/server.js'
     at Function.Module._resolveFilename (internal/modules/cjs/loader.js:902:15)
     at Function.Module._load (internal/modules/cjs/loader.js:746:27)
 """
-        },
-        "4": {
-            "name": "AWS Lambda Timeout",
-            "error": """
+    }),
+    "4": MappingProxyType({
+        "name": "AWS Lambda Timeout",
+        "error": """
 {
     "errorMessage": "2024-01-15T14:30:45.123Z 8f2b4a1c-1234-5678-9abc-def012345678 Task timed out after 30.00 seconds",
     "errorType": "Runtime.ExitError"
@@ -130,10 +292,10 @@ START RequestId: 8f2b4a1c-1234-5678-9abc-def012345678 Version: $LATEST
 END RequestId: 8f2b4a1c-1234-5678-9abc-def012345678
 REPORT RequestId: 8f2b4a1c-1234-5678-9abc-def012345678	Duration: 30003.45 ms	Billed Duration: 30000 ms	Memory Size: 512 MB	Max Memory Used: 256 MB
 """
-        },
-        "5": {
-            "name": "NGINX 502 Bad Gateway",
-            "error": """
+    }),
+    "5": MappingProxyType({
+        "name": "NGINX 502 Bad Gateway",
+        "error": """
 === NGINX Error Log ===
 2024/01/15 10:30:45 [error] 12345#12345: *67890 connect() failed (111: Connection refused) 
   while connecting to upstream, client: 192.168.1.100, server: api.example.com, 
@@ -151,37 +313,131 @@ $ systemctl status app-backend
    Active: failed (Result: exit-code) since Mon 2024-01-15 10:30:00 UTC; 45s ago
   Process: 12345 ExecStart=/usr/bin/python3 /app/main.py (code=exited, status=1/FAILURE)
 """
-        }
-    }
+    })
+})
+
+
+def get_sample_errors():
+    """Return sample errors for demonstration."""
+    return _SAMPLE_ERRORS
 
 
-def interactive_mode(responder: IncidentResponder):
+def _flush_stdin():
+    """
+    Discard any input already waiting on stdin.
+    
+    A terminal is flushed with one tcflush() call; for pipes and other
+    non-terminals, whatever is buffered is drained with a single
+    non-blocking read. POSIX only.
+    """
+    try:
+        import termios
+        import fcntl
+        fd = sys.stdin.fileno()
+    except Exception:
+        return
+    
+    try:
+        termios.tcflush(fd, termios.TCIFLUSH)
+    except termios.error:
+        try:
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            try:
+                os.read(fd, 1 << 16)
+            except (BlockingIOError, OSError):
+                pass
+            finally:
+                fcntl.fcntl(fd, fcntl.F_SETFL, flags)
+        except OSError:
+            pass
+
+
+def _stream_to_stdout(chunks: Iterator[str], flush_every: int = 16):
+    """
+    Write streamed text to stdout as it arrives.
+    
+    Chunks go straight to the binary buffer, which is flushed every
+    flush_every chunks or whenever a chunk ends a line, rather than once per
+    chunk. Falls back to the text stream if stdout has no buffer (e.g. when
+    it has been replaced in tests).
+    """
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        return
+    
+    # Anything already written through the text layer must come out first
+    sys.stdout.flush()
+    encoding = sys.stdout.encoding or "utf-8"
+    write = buffer.write
+    for i, chunk in enumerate(chunks, 1):
+        write(chunk.encode(encoding, "replace"))
+        if i % flush_every == 0 or "\n" in chunk:
+            buffer.flush()
+    buffer.flush()
+
+
+def _getch() -> str:
+    """Read a single keypress from the terminal without waiting for Enter."""
+    if sys.platform == 'win32':
+        import msvcrt
+        return msvcrt.getwch()
+    
+    import termios
+    import tty
+    fd = sys.stdin.fileno()
+    old_attrs = termios.tcgetattr(fd)
+    try:
+        # cbreak rather than raw mode, so Ctrl-C still interrupts
+        tty.setcbreak(fd)
+        return os.read(fd, 4).decode("utf-8", "replace")
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+
+
+def _read_yes_no(prompt: str) -> bool:
+    """
+    Ask a y/n question, answered with a single keypress.
+    
+    Falls back to line input when stdin is not a terminal (piped input).
+    """
+    if not sys.stdin.isatty():
+        return input(prompt).strip().lower() == "y"
+    
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    answer = _getch().lower()
+    print(answer.strip())
+    return answer == "y"
+
+
+def interactive_mode(responder: "IncidentResponder", use_cache: bool = True):
     """Run the agent in interactive mode."""
     print_banner()
     
     samples = get_sample_errors()
     
     # Flush stdin to clear any buffered input (for Docker/PTY)
-    try:
-        import select
-        if sys.platform != 'win32':
-            while select.select([sys.stdin], [], [], 0)[0]:
-                sys.stdin.read(1)
-    except Exception:
-        pass
+    if sys.platform != 'win32':
+        _flush_stdin()
+    
+    # The menu never changes, so format it once and reprint it on each retry
+    menu = (
+        "Choose an option:\n"
+        "  [1-5] Use a sample error\n"
+        "  [C]   Enter custom error\n"
+        "  [Q]   Quit\n"
+        "\nSample Errors:\n"
+        + "".join(f"  {key}. {sample['name']}\n" for key, sample in samples.items())
+        + "\n"
+    )
     
     # Loop until valid choice is made
     while True:
-        print("Choose an option:")
-        print("  [1-5] Use a sample error")
-        print("  [C]   Enter custom error")
-        print("  [Q]   Quit")
-        
-        print("\nSample Errors:")
-        for key, sample in samples.items():
-            print(f"  {key}. {sample['name']}")
-        
-        print()
+        sys.stdout.write(menu)
         sys.stdout.flush()
         
         try:
@@ -200,15 +456,14 @@ def interactive_mode(responder: IncidentResponder):
         
         if choice == "C":
             print("\nPaste your error (enter a blank line when done):")
+            sys.stdout.flush()
+            # Read the paste straight off stdin; EOF simply ends the loop
             lines = []
-            while True:
-                try:
-                    line = input()
-                    if line == "":
-                        break
-                    lines.append(line)
-                except EOFError:
+            for raw in sys.stdin:
+                line = raw.rstrip("\n")
+                if line == "":
                     break
+                lines.append(line)
             error_log = "\n".join(lines)
             break
         elif choice in samples:
@@ -225,23 +480,23 @@ def interactive_mode(responder: IncidentResponder):
     
     # Run the investigation
     try:
-        result = responder.investigate(error_log)
+        if use_cache:
+            result = cached_investigate(responder, error_log)
+        else:
+            result = responder.investigate(error_log)
         
         # Offer to stream a detailed explanation
-        explain = input("\nStream detailed explanation? (y/n): ").strip().lower()
-        if explain == "y":
+        if _read_yes_no("\nStream detailed explanation? (y/n): "):
             print("\n" + "="*60)
             print("SOLUTION EXPLANATION")
             print("="*60 + "\n")
             
             # Presentation layer: print chunks as they arrive
-            for chunk in responder.generate_solution_explanation(result):
-                print(chunk, end="", flush=True)
+            _stream_to_stdout(responder.generate_solution_explanation(result))
             print("\n")
         
         # Ask if user wants to save the report
-        save = input("\nSave report to file? (y/n): ").strip().lower()
-        if save == "y":
+        if _read_yes_no("\nSave report to file? (y/n): "):
             save_report(result)
             
     except KeyboardInterrupt:
@@ -253,60 +508,133 @@ def interactive_mode(responder: IncidentResponder):
         return  # Return to menu safely instead of crashing
 
 
-def save_report(state: AgentState, filename: Optional[str] = None):
+def save_report(state: "AgentState", filename: Optional[str] = None):
     """Save the investigation report to a file."""
     if filename is None:
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"incident_report_{timestamp}.md"
     
-    report = f"""# Incident Investigation Report
+    get = state.get
+    
+    # Write each section straight to the file: the report is never built up
+    # as one string, and the (possibly long) error log is never copied
+    with open(filename, 'w', buffering=1 << 16, encoding='utf-8') as f:
+        f.write(f"""# Incident Investigation Report
 
 ## Error Summary
-**Type:** {state.get('error_type', 'unknown')}
-**Confidence:** {state.get('solution_confidence', 0):.0%}
-**Iterations:** {state.get('iterations', 0)}
+**Type:** {get('error_type', 'unknown')}
+**Confidence:** {get('solution_confidence', 0):.0%}
+**Iterations:** {get('iterations', 0)}
 
 ## Original Error
 ```
-{state.get('error_log', 'N/A')}
+""")
+        f.write(get('error_log', 'N/A'))
+        f.write(f"""
 ```
 
 ## Diagnosis
-{state.get('error_summary', 'N/A')}
+{get('error_summary', 'N/A')}
 
 ## Affected Components
-{', '.join(state.get('affected_components', ['N/A']))}
+{', '.join(get('affected_components') or _NA)}
 
 ## Proposed Solution
-{state.get('proposed_solution', 'N/A')}
+{get('proposed_solution', 'N/A')}
 
 ## Implementation Steps
-"""
-    
-    for i, step in enumerate(state.get('solution_steps', []), 1):
-        report += f"{i}. {step}\n"
-    
-    if state.get('code_changes'):
-        report += f"""
+""")
+        f.writelines(
+            f"{i}. {step}\n" for i, step in enumerate(get('solution_steps', []), 1)
+        )
+        
+        if get('code_changes'):
+            f.write(f"""
 ## Code Changes
 ```
-{state.get('code_changes')}
+{get('code_changes')}
 ```
-"""
-    
-    if state.get('needs_human_approval'):
-        report += f"""
+""")
+        
+        if get('needs_human_approval'):
+            f.write(f"""
 ## Requires Human Approval
-{state.get('pending_action', 'No details provided')}
-"""
-    
-    with open(filename, 'w') as f:
-        f.write(report)
+{get('pending_action', 'No details provided')}
+""")
     
     print(f"Report saved to: {filename}")
 
 
+def report_filenames(log_paths: List[str]) -> List[str]:
+    """
+    Name a report for each log matched by a --file glob.
+    
+    Names come from each log's path relative to the matches' common
+    directory (so svc-a/error.log and svc-b/error.log don't collide); any
+    name that still clashes gets a numeric suffix.
+    
+    Args:
+        log_paths: The matched log files
+        
+    Returns:
+        One unique report file name per log, in the same order
+    """
+    abs_paths = [os.path.abspath(path) for path in log_paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in abs_paths])
+    
+    names = []
+    seen = set()
+    for path in abs_paths:
+        stem = "_".join(Path(os.path.relpath(path, root)).with_suffix("").parts)
+        name = f"incident_report_{stem}.md"
+        suffix = 2
+        while name in seen:
+            name = f"incident_report_{stem}_{suffix}.md"
+            suffix += 1
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def report_directory(output: Optional[str]) -> Path:
+    """
+    Directory that modes saving one report per incident write into.
+    
+    Args:
+        output: The --output value; created if it doesn't exist
+        
+    Returns:
+        The output directory, or the current directory if none was given
+    """
+    if not output:
+        return Path()
+    report_dir = Path(output)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    return report_dir
+
+
+def write_jsonl_reports(states: List["AgentState"], path: str):
+    """
+    Append one JSON line per investigation to path.
+    
+    The file is opened once for the whole batch and locked while writing
+    (where flock is available), so concurrent CLI runs can share one sink.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    
+    with open(path, 'a', buffering=1 << 16, encoding='utf-8') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        for state in states:
+            f.write(json.dumps({key: state.get(key) for key in REPORT_KEYS}) + "\n")
+    
+    print(f"{len(states)} report(s) appended to: {path}")
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -317,7 +645,9 @@ Examples:
   python -m src.main                           # Interactive mode
   python -m src.main --error "Error message"   # Direct input
   python -m src.main --file error.log          # From file
+  python -m src.main --file "logs/*.log"       # Every matching file, in parallel
   python -m src.main --provider gemini         # Use Gemini LLM
+  python -m src.main --batch-samples           # Run every sample error
         """
     )
     
@@ -330,7 +660,8 @@ Examples:
     parser.add_argument(
         "--file", "-f",
         type=str,
-        help="File containing the error log"
+        help="File containing the error log (a glob pattern investigates every "
+             "match concurrently and saves incident_report_<path>.md for each)"
     )
     
     parser.add_argument(
@@ -354,6 +685,14 @@ Examples:
         help="Maximum research iterations (default: 3)"
     )
     
+    parser.add_argument(
+        "--max-log-bytes",
+        type=int,
+        metavar="N",
+        help="Only investigate the last N bytes of each --file log (default: "
+             f"the whole file; e.g. {MAX_LOG_BYTES} for very large logs)"
+    )
+    
     parser.add_argument(
         "--quiet", "-q",
         action="store_true",
@@ -363,26 +702,49 @@ Examples:
     parser.add_argument(
         "--output", "-o",
         type=str,
-        help="Save report to specified file"
+        help="Save report to specified file (with a --file glob or "
+             "--batch-samples, the directory to save the reports in)"
+    )
+    
+    parser.add_argument(
+        "--jsonl-output",
+        type=str,
+        metavar="PATH",
+        help="Append one JSON line per investigation to PATH (for batch and CI "
+             "runs this replaces the per-run markdown reports)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always run a fresh investigation instead of reusing a cached one"
+    )
+    
+    parser.add_argument(
+        "--batch-samples",
+        action="store_true",
+        help="Investigate all sample errors, diagnosing them in one LLM call, "
+             "and save a report for each"
     )
     
     args = parser.parse_args()
     
-    # Check for required API keys
-    required_keys = {
-        "gemini": "GOOGLE_API_KEY"
-    }
+    # Load .env before checking for keys so values from it count
+    from dotenv import load_dotenv
+    load_dotenv()
     
-    llm_key = required_keys.get(args.provider)
-    if llm_key and not os.getenv(llm_key):
+    # Check for required API keys
+    llm_key = _REQUIRED_KEYS.get(args.provider)
+    if llm_key and not os.environ.get(llm_key):
         print(f"Warning: {llm_key} not found in environment variables")
         print(f"   Set it with: set {llm_key}=your-api-key")
     
-    if not os.getenv("TAVILY_API_KEY"):
+    if not os.environ.get("TAVILY_API_KEY"):
         print("Warning: TAVILY_API_KEY not found in environment variables")
         print("   Web search will not work. Get a free key at https://tavily.com")
     
     # Initialise the responder
+    from src.graph import IncidentResponder
     responder = IncidentResponder(
         llm_provider=args.provider,
         llm_model=args.model,
@@ -391,11 +753,23 @@ Examples:
     
     # Determine input source
     error_log = None
+    log_paths = []
     
-    if args.file:
+    if args.file and any(ch in args.file for ch in "*?["):
+        log_paths = sorted(glob.glob(args.file))
+        if not log_paths:
+            print(f"No files match: {args.file}")
+            sys.exit(1)
         try:
-            with open(args.file, 'r') as f:
-                error_log = f.read()
+            error_logs = [read_error_log(path, args.max_log_bytes) for path in log_paths]
+        except Exception as e:
+            print(f"Could not read file: {e}")
+            sys.exit(1)
+        print(f"Loaded {len(log_paths)} error logs matching: {args.file}")
+    
+    elif args.file:
+        try:
+            error_log = read_error_log(args.file, args.max_log_bytes)
             print(f"Loaded error from: {args.file}")
         except Exception as e:
             print(f"Could not read file: {e}")
@@ -405,13 +779,39 @@ Examples:
         error_log = args.error
     
     # Run investigation or interactive mode
-    if error_log:
-        result = responder.investigate(error_log, max_iterations=args.max_iterations)
+    if args.batch_samples:
+        samples = get_sample_errors()
+        results = responder.investigate_batch(
+            [sample["error"] for sample in samples.values()],
+            max_iterations=args.max_iterations
+        )
+        if args.jsonl_output:
+            write_jsonl_reports(results, args.jsonl_output)
+        else:
+            report_dir = report_directory(args.output)
+            for key, result in zip(samples, results):
+                save_report(result, str(report_dir / f"incident_report_sample_{key}.md"))
+    elif log_paths:
+        # Investigations wait on remote APIs, so run them concurrently
+        results = responder.investigate_many(error_logs, max_iterations=args.max_iterations)
+        if args.jsonl_output:
+            write_jsonl_reports(results, args.jsonl_output)
+        else:
+            report_dir = report_directory(args.output)
+            for filename, result in zip(report_filenames(log_paths), results):
+                save_report(result, str(report_dir / filename))
+    elif error_log:
+        if args.no_cache:
+            result = responder.investigate(error_log, max_iterations=args.max_iterations)
+        else:
+            result = cached_investigate(responder, error_log, max_iterations=args.max_iterations)
         
         if args.output:
             save_report(result, args.output)
+        if args.jsonl_output:
+            write_jsonl_reports([result], args.jsonl_output)
     else:
-        interactive_mode(responder)
+        interactive_mode(responder, use_cache=not args.no_cache)
 
 
 if __name__ == "__main__":
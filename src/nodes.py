@@ -8,14 +8,63 @@ Uses JSON parsing for structured LLM outputs.
 
 import re
 import json
-from typing import Dict, Any, Optional, List
+import hashlib
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Dict, Any, Optional, List, Tuple, Union
 from .state import AgentState
 from .llm import BaseLLM, get_llm
 from .tools import TavilySearchTool, FileReaderTool
+from .tools.search_tool import SearchResult
 from . import prompts
+from .cache import LFUCache
 
+# orjson is an optional speed-up for parsing LLM output; its errors subclass
+# json.JSONDecodeError, so callers handle both the same way
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
-def parse_json_response(response: str) -> Dict[str, Any]:
+
+# Patterns used on every LLM response, compiled once at import. Thinking
+# blocks and markdown fences are removed together in one scan; the thinking
+# body is matched in runs of non-'<' characters rather than lazily, so long
+# reasoning is skipped without testing for the closing tag at every character.
+_CLEANUP_RE = re.compile(
+    r'<thinking>[^<]*(?:<(?!/thinking>)[^<]*)*</thinking>|```(?:json)?\s*'
+)
+_STEP_RE = re.compile(r'\d+\.\s*(.+)')
+
+# Shared decoder for raw_decode(), which parses the first JSON value at an
+# offset and ignores whatever follows it
+_DECODER = json.JSONDecoder()
+
+# Legacy field patterns, compiled on first use per field name
+_FIELD_PATTERN_CACHE: Dict[str, "re.Pattern[str]"] = {}
+
+
+def _field_pattern(field: str) -> "re.Pattern[str]":
+    """Return the compiled legacy-format pattern for a field name."""
+    pattern = _FIELD_PATTERN_CACHE.get(field)
+    if pattern is None:
+        # Pattern: FIELD_NAME: value (until next field or end)
+        pattern = re.compile(rf"{field}:\s*(.+?)(?=\n[A-Z_]+:|$)", re.DOTALL | re.IGNORECASE)
+        _FIELD_PATTERN_CACHE[field] = pattern
+    return pattern
+
+
+# Positions where any legacy field value can end: a newline followed by a
+# FIELD_NAME: header (any case, as the field patterns are case-insensitive)
+_BOUNDARY_RE = re.compile(r'\n[A-Z_]+:', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s*')
+_PLAIN_FIELD_RE = re.compile(r'[A-Za-z0-9_]+')
+
+
+def parse_json_response(response: Union[str, bytes]) -> Dict[str, Any]:
     """
     Parse a JSON response from the LLM.
     
@@ -25,34 +74,75 @@ def parse_json_response(response: str) -> Dict[str, Any]:
     - Trailing text after JSON
     
     Args:
-        response: The raw LLM response text
+        response: The raw LLM response text, or its UTF-8 bytes
         
     Returns:
         Parsed JSON as a dictionary
     """
-    # Remove <thinking>...</thinking> blocks
-    cleaned = re.sub(r'<thinking>.*?</thinking>', '', response, flags=re.DOTALL)
+    if isinstance(response, (bytes, bytearray)):
+        response = response.decode('utf-8', errors='replace')
+    
+    # Fast path: a response that is already clean JSON needs no clean-up
+    if response.lstrip().startswith('{'):
+        try:
+            parsed = _json_loads(response)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if isinstance(parsed, dict):
+                return parsed
     
-    # Remove markdown code blocks
-    cleaned = re.sub(r'```json\s*', '', cleaned)
-    cleaned = re.sub(r'```\s*', '', cleaned)
+    # Remove <thinking>...</thinking> blocks and markdown code fences
+    cleaned = _CLEANUP_RE.sub('', response)
     
-    # Find JSON object in the response
-    # Look for the first { and last }
     start = cleaned.find('{')
-    end = cleaned.rfind('}')
-    
-    if start != -1 and end != -1 and end > start:
-        json_str = cleaned[start:end + 1]
+    if start != -1:
+        # Parse the first complete object, ignoring any prose after it
         try:
-            return json.loads(json_str)
+            return _DECODER.raw_decode(cleaned, start)[0]
         except json.JSONDecodeError:
             pass
+        
+        # Otherwise try everything between the first { and last }
+        end = cleaned.rfind('}')
+        if end > start:
+            try:
+                return _json_loads(cleaned[start:end + 1])
+            except json.JSONDecodeError:
+                pass
     
     # Fallback: return empty dict if parsing fails
     return {}
 
 
+def parse_json_array_response(response: str) -> List[Dict[str, Any]]:
+    """
+    Parse a JSON array of objects from the LLM.
+    
+    Applies the same clean-up as parse_json_response, for prompts that
+    return one object per input item.
+    
+    Args:
+        response: The raw LLM response text
+        
+    Returns:
+        The parsed objects, or an empty list if parsing fails
+    """
+    cleaned = _CLEANUP_RE.sub('', response)
+    
+    start = cleaned.find('[')
+    end = cleaned.rfind(']')
+    
+    if start != -1 and end != -1 and end > start:
+        try:
+            items = _json_loads(cleaned[start:end + 1])
+        except json.JSONDecodeError:
+            return []
+        if isinstance(items, list) and all(isinstance(item, dict) for item in items):
+            return items
+    
+    return []
+
 def parse_llm_response(response: str, fields: List[str]) -> Dict[str, str]:
     """
     Legacy parser for structured LLM responses.
@@ -67,22 +157,296 @@ def parse_llm_response(response: str, fields: List[str]) -> Dict[str, str]:
     """
     result = {}
     
+    # The per-field regexes each rescan the response looking for where the
+    # value ends. For ASCII text the possible end points are the same for
+    # every field, so find them once and look each field's end up instead.
+    fast = response.isascii()
+    if fast:
+        lowered = response.lower()
+        boundaries = [m.start() for m in _BOUNDARY_RE.finditer(response)]
+        length = len(response)
+        # Where the pattern's "$" can match: the end, or before a final newline
+        end_before_newline = length - 1 if response.endswith("\n") else length
+    
     for field in fields:
-        # Pattern: FIELD_NAME: value (until next field or end)
-        pattern = rf"{field}:\s*(.+?)(?=\n[A-Z_]+:|$)"
-        match = re.search(pattern, response, re.DOTALL | re.IGNORECASE)
-        if match:
-            value = match.group(1).strip()
+        key = field.lower()
+        if fast and _PLAIN_FIELD_RE.fullmatch(field):
+            value = None
+            i = lowered.find(key + ":")
+            start = i + len(key) + 1
+            if i != -1 and start < length:
+                # Skip leading whitespace but leave at least one character
+                # (the value is ".+?", which must match something)
+                value_start = min(_WHITESPACE_RE.match(response, start).end(), length - 1)
+                stop = end_before_newline if end_before_newline > value_start else length
+                j = bisect_left(boundaries, value_start + 1)
+                if j < len(boundaries):
+                    stop = min(stop, boundaries[j])
+                value = response[value_start:stop]
+        else:
+            match = _field_pattern(field).search(response)
+            value = match.group(1) if match else None
+        
+        if value is not None:
+            value = value.strip()
             # Clean up list formatting
             if value.startswith("[") and value.endswith("]"):
                 value = value[1:-1]
-            result[field.lower()] = value
+            result[key] = value
         else:
-            result[field.lower()] = ""
+            result[key] = ""
             
     return result
 
 
+# =============================================================================
+# OUTPUT NORMALISATION
+# =============================================================================
+# Each node's LLM output arrives either as JSON or as legacy "FIELD: value"
+# text. These helpers turn both shapes into one typed record per node, so the
+# node bodies only read attributes.
+
+def _split_field(value: str, strip_quotes: bool = False) -> List[str]:
+    """
+    Split a legacy comma-separated field into its non-empty items.
+    
+    With strip_quotes, quote characters are removed from the ends of each
+    item only, so names such as O'Reilly.py keep their apostrophes.
+    """
+    items = (part.strip() for part in value.split(","))
+    if strip_quotes:
+        items = (item.strip("\"'") for item in items)
+    return [item for item in items if item]
+
+
+@dataclass
+class DiagnosticianOut:
+    """Normalised diagnostician output."""
+    error_type: str
+    error_summary: str
+    search_queries: List[str]
+    files_to_check: List[str]
+    affected_components: List[str]
+    severity: str
+
+
+@dataclass
+class WebscraperOut:
+    """Normalised webscraper analysis output."""
+    need_more: bool
+    refined_query: str
+    findings: List[str]
+    confident: bool
+
+
+@dataclass
+class SolverOut:
+    """Normalised solver output."""
+    confidence: float
+    steps: List[str]
+    requires_approval: bool
+    approval_reason: str
+    proposed_solution: str
+    code_changes: str
+
+
+def _normalize_diagnostician(parsed: Dict[str, Any], legacy: bool) -> DiagnosticianOut:
+    """
+    Normalise a parsed diagnostician response.
+
+    Args:
+        parsed: Output of parse_json_response, or of parse_llm_response
+        legacy: Whether parsed came from the legacy text parser
+
+    Returns:
+        DiagnosticianOut with list fields as lists in both cases
+    """
+    get = parsed.get
+    if legacy:
+        # Legacy parsing returns strings, need to split into lists
+        search_queries = _split_field(get("search_queries", ""))
+        files_to_check = _split_field(get("files_to_check", ""), strip_quotes=True)
+        affected_components = _split_field(get("affected_components", ""))
+    else:
+        search_queries = get("search_keywords", [])
+        files_to_check = get("files_to_check", [])
+        affected_components = get("affected_components", [])
+
+    return DiagnosticianOut(
+        error_type=get("error_type", "unknown"),
+        error_summary=get("error_summary", "N/A"),
+        search_queries=search_queries,
+        files_to_check=files_to_check,
+        affected_components=affected_components,
+        severity=str(get("severity", "")).strip().lower()
+    )
+
+
+def _normalize_webscraper(parsed: Dict[str, Any], legacy: bool) -> WebscraperOut:
+    """
+    Normalise a parsed webscraper analysis response.
+
+    Args:
+        parsed: Output of parse_json_response, or of parse_llm_response
+        legacy: Whether parsed came from the legacy text parser
+
+    Returns:
+        WebscraperOut with the findings to add to the research record
+    """
+    get = parsed.get
+    if legacy:
+        return WebscraperOut(
+            need_more=get("need_more_research", "no").lower() == "yes",
+            refined_query=get("refined_query", ""),
+            findings=[get("relevant_findings", ""), get("common_solutions", "")],
+            confident=get("confidence_level", "").lower().startswith("high")
+        )
+
+    # Format solutions with source attribution
+    findings_text = "\n".join([
+        f"- {s.get('solution_summary', '')} (Source: {s.get('source_url', 'unknown')}, Confidence: {s.get('confidence', 'unknown')})"
+        for s in get("relevant_solutions", [])
+    ])
+    patterns = ", ".join(get("common_patterns", []))
+    warnings = ", ".join(get("warnings", []))
+
+    return WebscraperOut(
+        need_more=get("needs_more_research", False),
+        refined_query=get("refined_query") or "",
+        findings=[
+            f"Solutions:\n{findings_text}",
+            f"Common patterns: {patterns}",
+            f"Warnings: {warnings}"
+        ],
+        confident=str(get("overall_confidence", "")).lower() == "high"
+    )
+
+
+def _normalize_solver(parsed: Dict[str, Any], legacy: bool, response: str) -> SolverOut:
+    """
+    Normalise a parsed solver response.
+
+    Args:
+        parsed: Output of parse_json_response, or of parse_llm_response
+        legacy: Whether parsed came from the legacy text parser
+        response: The raw LLM response (the legacy fallback solution text)
+
+    Returns:
+        SolverOut with display-ready solution and code change text
+    """
+    get = parsed.get
+    if legacy:
+        # Parse confidence score
+        try:
+            confidence = float(get("solution_confidence", "0.5"))
+        except ValueError:
+            confidence = 0.5
+
+        return SolverOut(
+            confidence=confidence,
+            steps=[s.strip() for s in _STEP_RE.findall(get("step_by_step", ""))],
+            requires_approval=get("requires_approval", "no").lower() == "yes",
+            approval_reason=get("approval_reason", ""),
+            proposed_solution=get("proposed_solution", response),
+            code_changes=get("code_changes", "")
+        )
+
+    steps = get("step_by_step", [])
+    commands = get("executable_commands", [])
+    file_changes = get("file_changes", [])
+    prevention = get("prevention", "")
+    verification = get("verification", "")
+
+    # Format proposed solution for display
+    solution_parts = [get("root_cause", ""), "", get("solution_summary", ""), ""]
+
+    if steps:
+        solution_parts.append("Steps:")
+        for i, step in enumerate(steps, 1):
+            solution_parts.append(f"  {i}. {step}")
+        solution_parts.append("")
+
+    if commands:
+        solution_parts.append("Commands to run:")
+        for cmd in commands:
+            solution_parts.append(f"  $ {cmd}")
+        solution_parts.append("")
+
+    if file_changes:
+        solution_parts.append("File changes:")
+        for fc in file_changes:
+            solution_parts.append(f"  - {fc.get('file_path', 'unknown')}: {fc.get('description', '')}")
+        solution_parts.append("")
+
+    if prevention:
+        solution_parts.append(f"Prevention: {prevention}")
+    if verification:
+        solution_parts.append(f"Verification: {verification}")
+
+    # Format code changes
+    code_changes_parts = []
+    for fc in file_changes:
+        if fc.get("before") and fc.get("after"):
+            code_changes_parts.append(f"File: {fc.get('file_path', 'unknown')}")
+            code_changes_parts.append(f"Before:\n{fc.get('before', '')}")
+            code_changes_parts.append(f"After:\n{fc.get('after', '')}")
+            code_changes_parts.append("---")
+
+    return SolverOut(
+        confidence=get("confidence_score", 0.5),
+        steps=steps,
+        requires_approval=get("requires_approval", False),
+        approval_reason=get("approval_reason") or "",
+        proposed_solution="\n".join(solution_parts),
+        code_changes="\n".join(code_changes_parts)
+    )
+
+
+# Most research/refine iterations an incident of each severity gets. The
+# caller's max_iterations is the upper bound, and critical incidents (like
+# unknown severities) get all of it, so there is no entry for them.
+SEVERITY_MAX_ITERATIONS = {"low": 1, "medium": 2, "high": 3}
+
+
+def iteration_budget(severity: str, max_iterations: int) -> int:
+    """
+    Scale the iteration limit to the diagnosed severity.
+    
+    Minor issues rarely need a refinement loop, so they get fewer research
+    passes; critical and unknown severities keep the caller's limit.
+    
+    Args:
+        severity: Severity from the diagnosis (low, medium, high, critical)
+        max_iterations: The caller's iteration limit
+        
+    Returns:
+        The iteration limit to use for this incident
+    """
+    return min(max_iterations, SEVERITY_MAX_ITERATIONS.get(severity, max_iterations))
+
+
+# Maximum web searches the webscraper runs at once
+MAX_SEARCH_WORKERS = 8
+
+# Characters of each search result's content passed to the LLM
+SEARCH_RESULT_CHARS = 1024
+
+# Total characters of search results passed to the LLM per research pass
+SEARCH_RESULTS_BUDGET = 32_000
+
+# Maximum code files the code collector reads at once
+MAX_READ_WORKERS = 8
+
+# Maximum error logs diagnosed together in one batch LLM call
+BATCH_DIAGNOSIS_SIZE = 8
+
+# Maximum LLM responses each NodeFactory keeps for repeated prompts
+LLM_CACHE_SIZE = 256
+
+# Maximum web search result sets each NodeFactory keeps for repeated queries
+SEARCH_CACHE_SIZE = 128
+
+
 class NodeFactory:
     """
     Factory class that creates node functions with injected dependencies.
@@ -94,7 +458,8 @@ class NodeFactory:
         llm: Optional[BaseLLM] = None,
         search_tool: Optional[TavilySearchTool] = None,
         file_tool: Optional[FileReaderTool] = None,
-        verbose: bool = True
+        verbose: bool = True,
+        llm_cache: bool = True
     ):
         """
         Initialise the node factory with dependencies.
@@ -104,17 +469,88 @@ class NodeFactory:
             search_tool: Tavily search tool instance
             file_tool: File reader tool instance
             verbose: Whether to print progress messages
+            llm_cache: Whether to reuse responses for repeated prompts
+                (disable when every call should sample afresh)
         """
-        self.llm = llm or get_llm("gemini")
-        self.search_tool = search_tool or TavilySearchTool()
-        self.file_tool = file_tool or FileReaderTool()
+        # Defaults are built on first use (see the properties below), so a
+        # factory whose nodes never touch a dependency doesn't pay to set it up
+        self._llm_override = llm
+        self._search_override = search_tool
+        self._file_override = file_tool
         self.verbose = verbose
+        self.llm_cache = llm_cache
+        self._llm_cache: LFUCache[str, str] = LFUCache(LLM_CACHE_SIZE)
+        self._search_cache: Dict[Tuple[str, int], List[SearchResult]] = {}
+        self._search_lock = threading.Lock()
         
+    @cached_property
+    def llm(self) -> BaseLLM:
+        """The LLM used for reasoning, created on first use."""
+        return self._llm_override or get_llm("gemini")
+    
+    @cached_property
+    def search_tool(self) -> TavilySearchTool:
+        """The web search tool, created on first use."""
+        return self._search_override or TavilySearchTool()
+    
+    @cached_property
+    def file_tool(self) -> FileReaderTool:
+        """The file reader tool, created on first use."""
+        return self._file_override or FileReaderTool()
+    
     def _log(self, message: str):
         """Print a log message if verbose mode is enabled."""
         if self.verbose:
             print(message)
     
+    def _cached_generate(self, prompt: str, system_prompt: str, iteration: int = 0) -> str:
+        """
+        Call the LLM, reusing the response for a prompt seen before.
+        
+        Responses are keyed by a digest of the model, system prompt, prompt
+        and research iteration, so an identical request (e.g. the same
+        incident investigated again by this factory) costs no API call. The
+        iteration keeps each refinement pass of one investigation from
+        replaying the previous pass's answer. At most LLM_CACHE_SIZE
+        responses are kept; the least frequently reused is dropped first, so
+        prompts that keep recurring survive a run of one-off incidents.
+        """
+        if not self.llm_cache:
+            return self.llm.generate(prompt=prompt, system_prompt=system_prompt)
+        
+        key = hashlib.blake2b(
+            "\0".join([
+                str(getattr(self.llm, "model", "")), str(iteration), system_prompt, prompt
+            ]).encode(),
+            digest_size=16
+        ).hexdigest()
+        
+        response = self._llm_cache.get(key)
+        if response is None:
+            response = self.llm.generate(prompt=prompt, system_prompt=system_prompt)
+            self._llm_cache.put(key, response)
+        return response
+    
+    def _cached_search(self, query: str, max_results: int) -> List[SearchResult]:
+        """
+        Run a technical web search, reusing results for a query seen before.
+        
+        Refinement passes often repeat an earlier query (differing at most in
+        case), so results are keyed by the lowercased query. Failed searches
+        are not cached. At most SEARCH_CACHE_SIZE result sets are kept; the
+        oldest is dropped first.
+        """
+        key = (query.lower(), max_results)
+        results = self._search_cache.get(key)
+        if results is None:
+            results = self.search_tool.search_technical(query, max_results=max_results)
+            # Searches run on worker threads, so evict and insert under a lock
+            with self._search_lock:
+                if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+                    self._search_cache.pop(next(iter(self._search_cache)), None)
+                self._search_cache[key] = results
+        return results
+    
     # =========================================================================
     # NODE 1: DIAGNOSTICIAN
     # =========================================================================
@@ -131,20 +567,22 @@ class NodeFactory:
         self._log("="*60)
         
         # Build the prompt
-        prompt = prompts.DIAGNOSTICIAN_PROMPT.format(
+        prompt = prompts.render(
+            prompts.DIAGNOSTICIAN_PROMPT,
             error_log=state["error_log"]
         )
         
         # Call LLM for analysis
-        response = self.llm.generate(
+        response = self._cached_generate(
             prompt=prompt,
             system_prompt=prompts.DIAGNOSTICIAN_SYSTEM
         )
         
         # Parse JSON response (with fallback to legacy parsing)
         parsed = parse_json_response(response)
+        legacy = not parsed
         
-        if not parsed:
+        if legacy:
             # Fallback to legacy text parsing
             parsed = parse_llm_response(response, [
                 "ERROR_TYPE",
@@ -155,50 +593,102 @@ class NodeFactory:
                 "SEVERITY",
                 "IMMEDIATE_ACTIONS"
             ])
-            # Legacy parsing returns strings, need to split into lists
-            search_queries = [
-                q.strip() 
-                for q in parsed.get("search_queries", "").split(",")
-                if q.strip()
-            ]
-            files_to_check = [
-                f.strip().strip('"').strip("'")
-                for f in parsed.get("files_to_check", "").split(",")
-                if f.strip()
-            ]
-            affected_components = [
-                c.strip()
-                for c in parsed.get("affected_components", "").split(",")
-                if c.strip()
-            ]
-        else:
-            # JSON parsing returns proper types
-            search_queries = parsed.get("search_keywords", [])
-            files_to_check = parsed.get("files_to_check", [])
-            affected_components = parsed.get("affected_components", [])
+        out = _normalize_diagnostician(parsed, legacy)
         
         # Log the findings
-        error_type = parsed.get("error_type", "unknown")
-        error_summary = parsed.get("error_summary", "N/A")
-        
-        self._log(f"\n[OK] Error Type: {error_type}")
-        self._log(f"Summary: {error_summary}")
-        if search_queries:
+        self._log(f"\n[OK] Error Type: {out.error_type}")
+        self._log(f"Summary: {out.error_summary}")
+        if out.search_queries:
             self._log("Will search for:")
-            for i, q in enumerate(search_queries[:3], 1):
+            for i, q in enumerate(out.search_queries[:3], 1):
                 self._log(f"  {i}. {q}")
         
         # Return state updates
         return {
-            "error_type": error_type,
-            "error_summary": error_summary,
-            "affected_components": affected_components,
-            "search_queries": search_queries[:5],
-            "files_to_check": files_to_check,
-            "messages": state.get("messages", []) + [f"[Diagnostician] {response}"],
+            "error_type": out.error_type,
+            "error_summary": out.error_summary,
+            "affected_components": out.affected_components,
+            "search_queries": out.search_queries[:5],
+            "files_to_check": out.files_to_check,
+            "max_iterations": iteration_budget(out.severity, state.get("max_iterations", 3)),
+            "messages": [f"[Diagnostician] {response}"],
             "status": "researching"
         }
     
+    def diagnose_batch(
+        self,
+        error_logs: List[str],
+        batch_size: int = BATCH_DIAGNOSIS_SIZE,
+        max_iterations: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Diagnose several error logs with one LLM call per batch.
+        
+        Each batch of up to batch_size logs is enumerated as ITEM 1..n in one
+        prompt and the model answers with a JSON array, so n diagnoses cost
+        one round trip. A batch whose array is unusable (unparseable, wrong
+        length, or items out of order) falls back to the regular
+        diagnostician for each of its logs.
+        
+        Args:
+            error_logs: The error messages or stack traces to diagnose
+            batch_size: Maximum logs per LLM call (answers degrade as
+                prompts get longer, so very large batches don't pay off)
+            max_iterations: Iteration limit each investigation starts from,
+                scaled down per log by its diagnosed severity
+            
+        Returns:
+            One diagnostician-style state update per log, in input order
+        """
+        self._log("\n" + "="*60)
+        self._log(f"DIAGNOSTICIAN NODE - Analysing {len(error_logs)} errors in batches of {batch_size}...")
+        self._log("="*60)
+        
+        updates = []
+        for start in range(0, len(error_logs), batch_size):
+            updates.extend(self._diagnose_chunk(error_logs[start:start + batch_size], max_iterations))
+        return updates
+    
+    def _diagnose_chunk(self, error_logs: List[str], max_iterations: int) -> List[Dict[str, Any]]:
+        """Diagnose one batch of error logs with a single LLM call."""
+        items = "\n\n".join(
+            prompts.render(prompts.BATCH_DIAGNOSTICIAN_ITEM, index=i, error_log=error_log)
+            for i, error_log in enumerate(error_logs, 1)
+        )
+        response = self._cached_generate(
+            prompt=prompts.render(prompts.BATCH_DIAGNOSTICIAN_PROMPT, count=len(error_logs), items=items),
+            system_prompt=prompts.DIAGNOSTICIAN_SYSTEM
+        )
+        parsed_items = parse_json_array_response(response)
+        
+        # Every log needs exactly one answer, and answers must be in item
+        # order, or they can't be matched back to their logs
+        usable = len(parsed_items) == len(error_logs) and all(
+            parsed.get("item", i) == i for i, parsed in enumerate(parsed_items, 1)
+        )
+        if not usable:
+            self._log("[WARN] Batch diagnosis unusable, diagnosing items one by one")
+            return [
+                self.diagnostician({"error_log": error_log, "max_iterations": max_iterations})
+                for error_log in error_logs
+            ]
+        
+        updates = []
+        for parsed in parsed_items:
+            out = _normalize_diagnostician(parsed, legacy=False)
+            self._log(f"[OK] Error Type: {out.error_type}")
+            updates.append({
+                "error_type": out.error_type,
+                "error_summary": out.error_summary,
+                "affected_components": out.affected_components,
+                "search_queries": out.search_queries[:5],
+                "files_to_check": out.files_to_check,
+                "max_iterations": iteration_budget(out.severity, max_iterations),
+                "messages": [f"[Diagnostician] {json.dumps(parsed)}"],
+                "status": "researching"
+            })
+        return updates
+    
     # =========================================================================
     # NODE 2: WEBSCRAPER
     # =========================================================================
@@ -215,44 +705,82 @@ class NodeFactory:
         self._log("="*60)
         
         all_results = []
-        queries = state.get("search_queries", [])
+        # Drop queries that differ only in case or surrounding whitespace
+        queries = []
+        seen_queries = set()
+        for query in state.get("search_queries", []):
+            key = query.strip().lower()
+            if key not in seen_queries:
+                seen_queries.add(key)
+                queries.append(query.strip())
         
         if queries:
             self._log("\nSearching:")
             for query in queries:
                 self._log(f'  - "{query}"')
         
-        # Execute each search query
-        for query in queries:
+        # Searches are independent network round trips, so run them together
+        def search(query: str):
             try:
-                results = self.search_tool.search_technical(query, max_results=5)
-                for result in results:
-                    all_results.append(f"[{result.title}]({result.url})\n{result.content}")
-                    self._log(f"  Found: {result.title}")
-                    self._log(f"         {result.url}")
+                return self._cached_search(query, max_results=5), None
             except Exception as e:
-                self._log(f"  [WARN] Search failed: {e}")
-                all_results.append(f"Search for '{query}' failed: {str(e)}")
+                return None, e
+        
+        if len(queries) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_SEARCH_WORKERS, len(queries))) as executor:
+                outcomes = list(executor.map(search, queries))
+        else:
+            outcomes = [search(query) for query in queries]
+        
+        # Collect results in query order, skipping pages already seen. Prompt
+        # size drives the analysis call's latency and cost, so each result is
+        # clipped and results stop once the total budget is spent.
+        seen_urls = set()
+        budget = SEARCH_RESULTS_BUDGET
+        budget_spent = False
+        for query, (results, error) in zip(queries, outcomes):
+            if error is not None:
+                self._log(f"  [WARN] Search failed: {error}")
+                all_results.append(f"Search for '{query}' failed: {str(error)}")
+                continue
+            for result in results:
+                if result.url in seen_urls:
+                    continue
+                seen_urls.add(result.url)
+                entry = f"[{result.title}]({result.url})\n{result.content[:SEARCH_RESULT_CHARS]}"
+                if len(entry) > budget:
+                    budget_spent = True
+                    break
+                budget -= len(entry)
+                all_results.append(entry)
+                self._log(f"  Found: {result.title}")
+                self._log(f"         {result.url}")
+            if budget_spent:
+                # Later queries' results would overrun the budget too
+                break
         
         # Format results for LLM
         search_results_text = "\n\n---\n\n".join(all_results) if all_results else "No search results found."
         
         # Ask LLM to analyse findings
-        prompt = prompts.WEBSCRAPER_PROMPT.format(
+        prompt = prompts.render(
+            prompts.WEBSCRAPER_PROMPT,
             error_summary=state.get("error_summary", ""),
             error_type=state.get("error_type", "unknown"),
             search_results=search_results_text
         )
         
-        response = self.llm.generate(
+        response = self._cached_generate(
             prompt=prompt,
-            system_prompt=prompts.WEBSCRAPER_SYSTEM
+            system_prompt=prompts.WEBSCRAPER_SYSTEM,
+            iteration=state.get("iterations", 0)
         )
         
         # Parse JSON response (with fallback)
         parsed = parse_json_response(response)
+        legacy = not parsed
         
-        if not parsed:
+        if legacy:
             # Fallback to legacy text parsing
             parsed = parse_llm_response(response, [
                 "RELEVANT_FINDINGS",
@@ -262,127 +790,149 @@ class NodeFactory:
                 "NEED_MORE_RESEARCH",
                 "REFINED_QUERY"
             ])
-            need_more = parsed.get("need_more_research", "no").lower() == "yes"
-            refined_query = parsed.get("refined_query", "")
-            new_findings = [
-                parsed.get("relevant_findings", ""),
-                parsed.get("common_solutions", "")
-            ]
-        else:
-            # JSON response
-            need_more = parsed.get("needs_more_research", False)
-            refined_query = parsed.get("refined_query") or ""
-            
-            # Format solutions with source attribution
-            solutions = parsed.get("relevant_solutions", [])
-            findings_text = "\n".join([
-                f"- {s.get('solution_summary', '')} (Source: {s.get('source_url', 'unknown')}, Confidence: {s.get('confidence', 'unknown')})"
-                for s in solutions
-            ])
-            patterns = ", ".join(parsed.get("common_patterns", []))
-            warnings = ", ".join(parsed.get("warnings", []))
-            
-            new_findings = [
-                f"Solutions:\n{findings_text}",
-                f"Common patterns: {patterns}",
-                f"Warnings: {warnings}"
-            ]
+        out = _normalize_webscraper(parsed, legacy)
         
-        # Update research findings
-        existing_findings = state.get("research_findings", [])
+        # Update research findings. Refinement passes often restate earlier
+        # findings; drop exact repeats (keeping order) so the solver prompt
+        # doesn't carry them twice.
+        research_findings = list(dict.fromkeys(state.get("research_findings", []) + out.findings))
         
         # Handle refinement loop
         iterations = state.get("iterations", 0) + 1
         max_iterations = state.get("max_iterations", 3)
         
-        # If we need more research and haven't hit max iterations
-        if need_more and refined_query and iterations < max_iterations:
+        # If we need more research and haven't hit max iterations. Findings
+        # the model rates highly confident are taken as final.
+        if out.need_more and out.refined_query and not out.confident and iterations < max_iterations:
             self._log(f"\nNeed more research (iteration {iterations}/{max_iterations})")
-            self._log(f"   Refined query: {refined_query}")
+            self._log(f"   Refined query: {out.refined_query}")
             
             return {
-                "research_findings": existing_findings + new_findings,
-                "search_queries": [refined_query],
+                "research_findings": research_findings,
+                "search_queries": [out.refined_query],
                 "iterations": iterations,
-                "messages": state.get("messages", []) + [f"[Webscraper] {response}"],
+                "messages": [f"[Webscraper] {response}"],
                 "status": "researching"  # Stay in research loop
             }
         
         self._log(f"\n[OK] Research complete after {iterations} iteration(s)")
         
         return {
-            "research_findings": existing_findings + new_findings,
+            "research_findings": research_findings,
             "relevant_docs": [search_results_text],
             "iterations": iterations,
-            "messages": state.get("messages", []) + [f"[Webscraper] {response}"],
+            "messages": [f"[Webscraper] {response}"],
             "status": "auditing"
         }
     
     # =========================================================================
-    # NODE 3: CODE AUDITOR
+    # NODE 3: CODE COLLECTOR
     # =========================================================================
     
-    def code_auditor(self, state: AgentState) -> Dict[str, Any]:
+    def code_collector(self, state: AgentState) -> Dict[str, Any]:
         """
-        Examine relevant code files to find the root cause.
+        Find and read the code files named by the diagnosis.
         
-        Reads code files that might be related to the error and analyses
-        them in context of the diagnosis and research findings.
+        Only needs the diagnostician's output, so the graph runs it alongside
+        the webscraper: disk reads overlap with web search latency.
         """
         self._log("\n" + "="*60)
-        self._log("CODE AUDITOR NODE - Examining code files...")
+        self._log("CODE COLLECTOR NODE - Gathering code files...")
         self._log("="*60)
         
         files_to_check = state.get("files_to_check", [])
-        code_context = ""
+        code_parts: List[str] = []
         
         if files_to_check:
-            # Try to find and read the files
+            # Find candidates for every pattern in one walk of the tree:
+            # files named exactly like the pattern, then names containing it
+            search_patterns = []
+            for file_pattern in files_to_check:
+                search_patterns += [f"**/{file_pattern}", f"*{file_pattern}*"]
+            try:
+                found = self.file_tool.find_files_by_pattern(search_patterns)
+            except Exception as e:
+                self._log(f"  [WARN] Search failed: {e}")
+                found = {}
+            
+            to_read = []
             for file_pattern in files_to_check:
                 self._log(f"\nLooking for: {file_pattern}")
-                
-                try:
-                    # Try to find files matching the pattern
-                    matches = self.file_tool.find_files([f"**/{file_pattern}", f"**/*{file_pattern}*"])
-                    
-                    for match in matches[:2]:  # Limit to 2 files per pattern
+                # Exact-name matches come first, so a substring hit such as
+                # test_config.py can't push out the real config.py
+                candidates = list(dict.fromkeys(
+                    found.get(f"**/{file_pattern}", []) + found.get(f"*{file_pattern}*", [])
+                ))
+                for match in candidates[:2]:  # Limit to 2 files per pattern
+                    if match not in to_read:
                         self._log(f"  Reading: {match}")
-                        try:
-                            content = self.file_tool.read_file(match)
-                            code_context += self.file_tool.format_file_content(content)
-                        except Exception as e:
-                            self._log(f"  [WARN] Could not read: {e}")
-                            
+                        to_read.append(match)
+            
+            # Reads are independent, so overlap their I/O
+            def read(path: str):
+                try:
+                    return self.file_tool.read_file(path), None
                 except Exception as e:
-                    self._log(f"  [WARN] Search failed: {e}")
+                    return None, e
+            
+            with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as executor:
+                outcomes = list(executor.map(read, to_read))
+            
+            for content, error in outcomes:
+                if error is not None:
+                    self._log(f"  [WARN] Could not read: {error}")
+                else:
+                    code_parts.append(self.file_tool.format_file_content(content))
         
+        # Join once at the end rather than growing one string per file
+        code_context = "".join(code_parts)
         if not code_context:
-            code_context = "No relevant code files found or accessible."
             self._log("\n[WARN] No code files found to audit")
         
+        return {"code_files": code_context}
+    
+    # =========================================================================
+    # NODE 4: CODE AUDITOR
+    # =========================================================================
+    
+    def code_auditor(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Examine the collected code files to find the root cause.
+        
+        Analyses the files gathered by the code collector in context of the
+        diagnosis and research findings.
+        """
+        self._log("\n" + "="*60)
+        self._log("CODE AUDITOR NODE - Examining code files...")
+        self._log("="*60)
+        
+        code_context = state.get("code_files") or "No relevant code files found or accessible."
+        
         # Ask LLM to analyse the code
-        prompt = prompts.CODE_AUDITOR_PROMPT.format(
+        prompt = prompts.render(
+            prompts.CODE_AUDITOR_PROMPT,
             error_summary=state.get("error_summary", ""),
             error_type=state.get("error_type", "unknown"),
             research_findings="\n".join(state.get("research_findings", [])),
             code_context=code_context
         )
         
-        response = self.llm.generate(
+        response = self._cached_generate(
             prompt=prompt,
-            system_prompt=prompts.CODE_AUDITOR_SYSTEM
+            system_prompt=prompts.CODE_AUDITOR_SYSTEM,
+            iteration=state.get("iterations", 0)
         )
         
         self._log("\n[OK] Code analysis complete")
         
         return {
             "code_context": code_context + f"\n\n[Analysis]\n{response}",
-            "messages": state.get("messages", []) + [f"[Code Auditor] {response}"],
+            "messages": [f"[Code Auditor] {response}"],
             "status": "solving"
         }
     
     # =========================================================================
-    # NODE 4: SOLVER
+    # NODE 5: SOLVER
     # =========================================================================
     
     def solver(self, state: AgentState) -> Dict[str, Any]:
@@ -397,22 +947,25 @@ class NodeFactory:
         self._log("="*60)
         
         # Build comprehensive prompt
-        prompt = prompts.SOLVER_PROMPT.format(
+        prompt = prompts.render(
+            prompts.SOLVER_PROMPT,
             error_summary=state.get("error_summary", ""),
             error_type=state.get("error_type", "unknown"),
             research_findings="\n".join(state.get("research_findings", [])),
             code_analysis=state.get("code_context", "No code analysis available")
         )
         
-        response = self.llm.generate(
+        response = self._cached_generate(
             prompt=prompt,
-            system_prompt=prompts.SOLVER_SYSTEM
+            system_prompt=prompts.SOLVER_SYSTEM,
+            iteration=state.get("iterations", 0)
         )
         
         # Parse JSON response (with fallback)
         parsed = parse_json_response(response)
+        legacy = not parsed
         
-        if not parsed:
+        if legacy:
             # Fallback to legacy text parsing
             parsed = parse_llm_response(response, [
                 "DIAGNOSIS_SUMMARY",
@@ -426,98 +979,33 @@ class NodeFactory:
                 "PREVENTION",
                 "VERIFICATION"
             ])
-            # Parse confidence score
-            try:
-                confidence = float(parsed.get("solution_confidence", "0.5"))
-            except ValueError:
-                confidence = 0.5
-            
-            # Parse steps
-            steps_text = parsed.get("step_by_step", "")
-            steps = [s.strip() for s in re.findall(r'\d+\.\s*(.+)', steps_text)]
-            
-            requires_approval = parsed.get("requires_approval", "no").lower() == "yes"
-            proposed_solution = parsed.get("proposed_solution", response)
-            code_changes = parsed.get("code_changes", "")
-            approval_reason = parsed.get("approval_reason", "")
-        else:
-            # JSON response - structured data
-            confidence = parsed.get("confidence_score", 0.5)
-            steps = parsed.get("step_by_step", [])
-            requires_approval = parsed.get("requires_approval", False)
-            approval_reason = parsed.get("approval_reason") or ""
-            
-            # Build human-readable solution from JSON
-            root_cause = parsed.get("root_cause", "")
-            solution_summary = parsed.get("solution_summary", "")
-            commands = parsed.get("executable_commands", [])
-            file_changes = parsed.get("file_changes", [])
-            prevention = parsed.get("prevention", "")
-            verification = parsed.get("verification", "")
-            
-            # Format proposed solution for display
-            solution_parts = [root_cause, "", solution_summary, ""]
-            
-            if steps:
-                solution_parts.append("Steps:")
-                for i, step in enumerate(steps, 1):
-                    solution_parts.append(f"  {i}. {step}")
-                solution_parts.append("")
-            
-            if commands:
-                solution_parts.append("Commands to run:")
-                for cmd in commands:
-                    solution_parts.append(f"  $ {cmd}")
-                solution_parts.append("")
-            
-            if file_changes:
-                solution_parts.append("File changes:")
-                for fc in file_changes:
-                    solution_parts.append(f"  - {fc.get('file_path', 'unknown')}: {fc.get('description', '')}")
-                solution_parts.append("")
-            
-            if prevention:
-                solution_parts.append(f"Prevention: {prevention}")
-            if verification:
-                solution_parts.append(f"Verification: {verification}")
-            
-            proposed_solution = "\n".join(solution_parts)
-            
-            # Format code changes
-            code_changes_parts = []
-            for fc in file_changes:
-                if fc.get("before") and fc.get("after"):
-                    code_changes_parts.append(f"File: {fc.get('file_path', 'unknown')}")
-                    code_changes_parts.append(f"Before:\n{fc.get('before', '')}")
-                    code_changes_parts.append(f"After:\n{fc.get('after', '')}")
-                    code_changes_parts.append("---")
-            code_changes = "\n".join(code_changes_parts)
-        
-        self._log(f"\n[OK] Solution confidence: {confidence:.0%}")
+        out = _normalize_solver(parsed, legacy, response)
+        
+        self._log(f"\n[OK] Solution confidence: {out.confidence:.0%}")
         
         # Determine final status
-        if requires_approval:
+        if out.requires_approval:
             self._log(f"[WARN] This solution requires human approval")
             status = "awaiting_approval"
-        elif confidence < 0.4:
+        elif out.confidence < 0.4:
             self._log(f"[WARN] Low confidence - may need more research")
             status = "complete"  # Still complete, but with low confidence warning
         else:
             status = "complete"
         
         return {
-            "proposed_solution": proposed_solution,
-            "solution_confidence": confidence,
-            "solution_steps": steps,
-            "code_changes": code_changes,
-            "needs_human_approval": requires_approval,
-            "pending_action": approval_reason,
-            "messages": state.get("messages", []) + [f"[Solver] {response}"],
+            "proposed_solution": out.proposed_solution,
+            "solution_confidence": out.confidence,
+            "solution_steps": out.steps,
+            "code_changes": out.code_changes,
+            "needs_human_approval": out.requires_approval,
+            "pending_action": out.approval_reason,
+            "messages": [f"[Solver] {response}"],
             "status": status
         }
     
     # =========================================================================
-    # NODE 5: HUMAN APPROVAL (Conditional)
+    # NODE 6: HUMAN APPROVAL (Conditional)
     # =========================================================================
     
     def human_approval(self, state: AgentState) -> Dict[str, Any]:
@@ -538,14 +1026,59 @@ class NodeFactory:
         
         return {
             "status": "awaiting_approval",
-            "messages": state.get("messages", []) + ["[System] Awaiting human approval"]
+            "messages": ["[System] Awaiting human approval"]
         }
 
 
+# =============================================================================
+# CACHE KEYS (for node-level caching)
+# =============================================================================
+
+def diagnosis_cache_key(state: AgentState) -> str:
+    """The diagnosis depends on the raw error log and the caller's iteration limit."""
+    return json.dumps([state["error_log"], state.get("max_iterations", 3)])
+
+
+def audit_cache_key(state: AgentState) -> str:
+    """
+    The audit depends on the diagnosis, research findings, and collected code.
+    
+    The research iteration is part of the key so a refinement pass audits
+    again rather than replaying the previous pass.
+    """
+    return json.dumps([
+        state.get("iterations", 0),
+        state.get("error_type", ""),
+        state.get("error_summary", ""),
+        state.get("research_findings", []),
+        state.get("code_files", ""),
+    ])
+
+
 # =============================================================================
 # ROUTING FUNCTIONS (for conditional edges)
 # =============================================================================
 
+def route_entry(state: AgentState):
+    """
+    Pick where a run starts.
+    
+    Fresh states start at the diagnostician. States that arrive already
+    diagnosed (e.g. from NodeFactory.diagnose_batch) skip straight to the
+    parallel research and code collection steps.
+    
+    Returns:
+        "diagnose", or ["research", "collect_code"] for pre-diagnosed states
+    """
+    if state.get("status") == "investigating":
+        return "diagnose"
+    return ["research", "collect_code"]
+
+
+# Confidence below which the solver sends the investigation back to research
+REFINE_CONFIDENCE_THRESHOLD = 0.3
+
+
 def should_continue_research(state: AgentState) -> str:
     """
     Determine if the webscraper should loop back for more searches.
@@ -554,12 +1087,9 @@ def should_continue_research(state: AgentState) -> str:
         "research" to continue searching
         "audit" to proceed to code audit
     """
-    if state.get("status") == "researching":
-        iterations = state.get("iterations", 0)
-        max_iterations = state.get("max_iterations", 3)
-        
-        if iterations < max_iterations:
-            return "research"
+    get = state.get
+    if get("status") == "researching" and get("iterations", 0) < get("max_iterations", 3):
+        return "research"
             
     return "audit"
 
@@ -573,16 +1103,15 @@ def check_solution_confidence(state: AgentState) -> str:
         "approve" if human approval needed
         "end" to finish
     """
-    confidence = state.get("solution_confidence", 0.0)
-    iterations = state.get("iterations", 0)
-    max_iterations = state.get("max_iterations", 3)
+    get = state.get
     
     # If very low confidence and haven't exhausted iterations, refine
-    if confidence < 0.3 and iterations < max_iterations:
+    if (get("solution_confidence", 0.0) < REFINE_CONFIDENCE_THRESHOLD
+            and get("iterations", 0) < get("max_iterations", 3)):
         return "refine"
     
     # If approval needed
-    if state.get("needs_human_approval", False):
+    if get("needs_human_approval", False):
         return "approve"
     
     return "end"
@@ -12,6 +12,10 @@ Key Design Principles:
 - Negative constraints (guides model away from common mistakes)
 """
 
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Optional, Tuple
+
 
 # =============================================================================
 # DIAGNOSTICIAN NODE PROMPTS (v2.0)
@@ -63,6 +67,43 @@ CONSTRAINTS:
 - Include specific error codes, library names, and versions in search_keywords"""
 
 
+BATCH_DIAGNOSTICIAN_PROMPT = """Analyse each of the {count} error logs below independently.
+
+{items}
+
+INSTRUCTIONS:
+1. First, reason briefly about each item inside <thinking> tags
+2. Then output a valid JSON array with exactly one object per item, in item order
+
+ALLOWED VALUES:
+- error_type: database | network | authentication | configuration | code_bug | dependency | resource_exhaustion | permission | timeout | unknown
+- severity: low | medium | high | critical
+
+OUTPUT FORMAT (JSON array only, no markdown):
+[
+    {{
+        "item": 1,
+        "error_type": "one of the allowed values above",
+        "severity": "one of the allowed values above",
+        "error_summary": "One clear sentence explaining what went wrong",
+        "affected_components": ["component1", "component2"],
+        "search_keywords": ["specific search query 1", "specific search query 2", "specific search query 3"],
+        "files_to_check": ["filename_pattern1", "filename_pattern2"],
+        "immediate_actions": ["first thing to check", "second thing to try"]
+    }}
+]
+
+CONSTRAINTS:
+- Do NOT merge items or skip any item, even if two look alike
+- Do NOT invent new error_type values
+- Do NOT use generic search terms like "error" or "bug"
+- Include specific error codes, library names, and versions in search_keywords"""
+
+BATCH_DIAGNOSTICIAN_ITEM = """ITEM {index}:
+<error_log>
+{error_log}
+</error_log>"""
+
 # =============================================================================
 # WEBSCRAPER NODE PROMPTS (v2.0)
 # =============================================================================
@@ -343,3 +384,36 @@ Provide a conversational explanation that:
 4. Ends with how to verify the fix worked
 
 Keep it concise but thorough. Use markdown formatting."""
+
+
+# =============================================================================
+# TEMPLATE RENDERING
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def _parse_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Split a template into (literal text, field name) pairs, once per template."""
+    return tuple((literal, field) for literal, field, _, _ in Formatter().parse(template))
+
+
+def render(template: str, **values: Any) -> str:
+    """
+    Fill a prompt template, equivalent to template.format(**values).
+    
+    str.format re-parses the template's placeholders on every call; this
+    parses each template once and afterwards only joins the pieces. Only
+    plain {name} fields are supported, which is all these prompts use.
+    
+    Args:
+        template: One of the prompt templates above
+        **values: Value for each {name} field
+        
+    Returns:
+        The rendered prompt
+    """
+    parts = []
+    for literal, field in _parse_template(template):
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(values[field]))
+    return "".join(parts)
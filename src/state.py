@@ -6,10 +6,34 @@ The state acts as the agent's "short-term memory" - tracking the investigation
 progress, findings, and decisions at each step.
 """
 
-from typing import TypedDict, List, Optional, Literal
+from typing import TypedDict, List, Optional, Literal, Annotated
 from dataclasses import dataclass, field
 
 
+# Only the most recent entries of the reasoning log are kept
+MAX_MESSAGES = 32
+
+
+def append_messages(existing: List[str], new: List[str]) -> List[str]:
+    """
+    Reducer for the messages log: append new entries, keep the last MAX_MESSAGES.
+    
+    Each node's raw LLM response is logged, so an unbounded log grows with
+    every research iteration; only its recent tail is ever useful.
+    
+    Args:
+        existing: The current log
+        new: Entries returned by a node
+        
+    Returns:
+        The combined log, trimmed to at most MAX_MESSAGES entries
+    """
+    combined = existing + new
+    if len(combined) > MAX_MESSAGES:
+        del combined[:-MAX_MESSAGES]
+    return combined
+
+
 class AgentState(TypedDict):
     """
     The central state object that gets passed between all nodes in the graph.
@@ -33,6 +57,7 @@ class AgentState(TypedDict):
     
     # Code Audit Phase
     files_to_check: List[str]  # File paths that might be related to the error
+    code_files: str  # Raw contents of the files gathered for auditing
     code_context: str  # Relevant code snippets from the codebase
     
     # Solution Phase
@@ -48,7 +73,9 @@ class AgentState(TypedDict):
     pending_action: str  # Description of action awaiting approval
     
     # Conversation History
-    messages: List[str]  # Log of agent's reasoning at each step
+    # Nodes return only their new entries; the reducer appends them to the
+    # log and keeps only the most recent MAX_MESSAGES
+    messages: Annotated[List[str], append_messages]  # Log of agent's reasoning at each step
     
     # Status
     status: Literal["investigating", "researching", "auditing", "solving", "awaiting_approval", "complete", "failed"]
@@ -74,6 +101,7 @@ def create_initial_state(error_log: str, max_iterations: int = 3) -> AgentState:
         research_findings=[],
         relevant_docs=[],
         files_to_check=[],
+        code_files="",
         code_context="",
         proposed_solution="",
         solution_confidence=0.0,
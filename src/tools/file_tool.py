@@ -5,15 +5,50 @@ Provides safe file reading capabilities for the agent to audit code.
 Includes safety checks to prevent reading sensitive files.
 """
 
+import io
+import logging
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Language names for code fences, by lowercased file extension
+_EXT_TO_LANG = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".jsx": "javascript",
+    ".tsx": "typescript",
+    ".java": "java",
+    ".go": "go",
+    ".rs": "rust",
+    ".cpp": "cpp",
+    ".c": "c",
+    ".h": "c",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".json": "json",
+    ".toml": "toml",
+    ".md": "markdown",
+    ".html": "html",
+    ".css": "css",
+    ".sql": "sql",
+    ".sh": "bash",
+    ".dockerfile": "dockerfile",
+}
+
+
+@dataclass(frozen=True)
 class FileContent:
     """Represents the content of a read file."""
+    __slots__ = ("path", "content", "language", "line_count")
+    
     path: str
     content: str
     language: str
@@ -28,7 +63,7 @@ class FileReaderTool:
     - Configurable base directory (sandboxing)
     - Extension filtering (only read code files)
     - Sensitive file protection (.env, secrets, etc.)
-    - Line limiting to prevent huge file reads
+    - Line and size limiting to prevent huge file reads
     """
     
     # File extensions we consider safe to read
@@ -56,7 +91,9 @@ class FileReaderTool:
         self,
         base_directory: Optional[str] = None,
         max_lines: int = 500,
-        allowed_extensions: Optional[Set[str]] = None
+        max_chars: int = 64 * 1024,
+        allowed_extensions: Optional[Set[str]] = None,
+        index_ttl: float = 30.0
     ):
         """
         Initialise the file reader tool.
@@ -64,11 +101,28 @@ class FileReaderTool:
         Args:
             base_directory: Root directory for all file operations (sandbox)
             max_lines: Maximum lines to read from any single file
+            max_chars: Maximum characters to read from any single file, so
+                files with few but very long lines (minified bundles, JSON
+                dumps) stay bounded too
             allowed_extensions: Override default allowed extensions
+            index_ttl: Seconds a directory listing is reused by find_files
+                calls (0 walks the tree on every call)
         """
         self.base_directory = Path(base_directory) if base_directory else Path.cwd()
         self.max_lines = max_lines
+        self.max_chars = max_chars
         self.allowed_extensions = allowed_extensions or self.ALLOWED_EXTENSIONS
+        # Suffixes are lowercased before the check, so compare lowercase entries
+        self._allowed_ext_lower = frozenset(ext.lower() for ext in self.allowed_extensions)
+        self.index_ttl = index_ttl
+        # All blocked patterns as one alternation, matched against the
+        # lowercased path exactly like the per-pattern substring checks
+        self._blocked_re = re.compile(
+            "|".join(re.escape(blocked.lower()) for blocked in self.BLOCKED_PATTERNS)
+        )
+        self._base_resolved: Tuple[Optional[Path], Tuple[str, str]] = (None, ("", ""))
+        # excluded dirs -> (built at, base dir mtime, relative file paths)
+        self._index_cache: Dict[FrozenSet[str], Tuple[float, float, List[Path]]] = {}
         
     def _is_safe_path(self, file_path: Path) -> bool:
         """
@@ -86,46 +140,41 @@ class FileReaderTool:
         except (OSError, ValueError):
             return False
             
-        # Check if within base directory (prevent directory traversal)
-        try:
-            resolved.relative_to(self.base_directory.resolve())
-        except ValueError:
+        # Check if within base directory (prevent directory traversal). Both
+        # sides are resolved, so a string prefix check on whole path
+        # components is equivalent to relative_to() without the exception.
+        resolved_str = str(resolved)
+        base_str, base_prefix = self._base_prefix()
+        normalised = os.path.normcase(resolved_str)
+        if normalised != base_str and not normalised.startswith(base_prefix):
             return False
             
         # Check against blocked patterns
-        path_str = str(resolved).lower()
-        for blocked in self.BLOCKED_PATTERNS:
-            if blocked.lower() in path_str:
-                return False
+        if self._blocked_re.search(resolved_str.lower()):
+            return False
                 
         return True
     
+    def _base_prefix(self) -> Tuple[str, str]:
+        """
+        Return the resolved base directory and its prefix for contained paths.
+        
+        Both are case-normalised for the platform, and recomputed only if
+        base_directory is reassigned.
+        """
+        base, strings = self._base_resolved
+        if base is not self.base_directory:
+            base = self.base_directory
+            base_str = os.path.normcase(str(base.resolve()))
+            # The filesystem root already ends with a separator
+            prefix = base_str if base_str.endswith(os.sep) else base_str + os.sep
+            strings = (base_str, prefix)
+            self._base_resolved = (base, strings)
+        return strings
+    
     def _detect_language(self, file_path: Path) -> str:
         """Detect programming language from file extension."""
-        ext_to_lang = {
-            ".py": "python",
-            ".js": "javascript",
-            ".ts": "typescript",
-            ".jsx": "javascript",
-            ".tsx": "typescript",
-            ".java": "java",
-            ".go": "go",
-            ".rs": "rust",
-            ".cpp": "cpp",
-            ".c": "c",
-            ".h": "c",
-            ".yaml": "yaml",
-            ".yml": "yaml",
-            ".json": "json",
-            ".toml": "toml",
-            ".md": "markdown",
-            ".html": "html",
-            ".css": "css",
-            ".sql": "sql",
-            ".sh": "bash",
-            ".dockerfile": "dockerfile",
-        }
-        return ext_to_lang.get(file_path.suffix.lower(), "text")
+        return _EXT_TO_LANG.get(file_path.suffix.lower(), "text")
     
     def read_file(self, file_path: str) -> FileContent:
         """
@@ -152,23 +201,28 @@ class FileReaderTool:
             raise ValueError(f"Access denied: {file_path} is blocked for security reasons")
             
         # Check extension
-        if path.suffix.lower() not in self.allowed_extensions:
+        if path.suffix.lower() not in self._allowed_ext_lower:
             raise ValueError(f"File type not allowed: {path.suffix}")
             
         # Read file with line limit
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
             
-        lines = []
+        # Read at most max_chars (+1 to detect truncation), never the whole file
         try:
             with open(path, "r", encoding="utf-8", errors="replace") as f:
-                for i, line in enumerate(f):
-                    if i >= self.max_lines:
-                        lines.append(f"\n... [Truncated at {self.max_lines} lines] ...")
-                        break
-                    lines.append(line)
+                data = f.read(self.max_chars + 1)
         except Exception as e:
             raise IOError(f"Error reading file: {e}")
+        
+        truncated = len(data) > self.max_chars
+        # Split the bounded chunk in one C-level pass rather than line by line
+        lines = io.StringIO(data[:self.max_chars]).readlines()
+        if len(lines) > self.max_lines:
+            del lines[self.max_lines:]
+            lines.append(f"\n... [Truncated at {self.max_lines} lines] ...")
+        elif truncated:
+            lines.append(f"\n... [Truncated at {self.max_chars} characters] ...")
             
         content = "".join(lines)
         
@@ -194,39 +248,122 @@ class FileReaderTool:
         Returns:
             List of matching file paths
         """
-        excluded_set = set(exclude_dirs or ["node_modules", ".git", "__pycache__", "venv", ".venv"])
-        matches = []
+        matches = self.find_files_by_pattern(patterns, exclude_dirs)
+        return sorted({path for paths in matches.values() for path in paths})
+    
+    def find_files_by_pattern(
+        self,
+        patterns: List[str],
+        exclude_dirs: Optional[List[str]] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Find files matching each of several patterns in a single directory walk.
+        
+        Patterns match like rglob() patterns, i.e. against the end of each
+        path relative to base_directory, but the tree is only walked once no
+        matter how many patterns are given (and the listing is reused by
+        later calls within index_ttl).
         
+        Args:
+            patterns: List of glob patterns (e.g., ["*.py", "docker-compose*.yml"])
+            exclude_dirs: Directories to skip (e.g., ["node_modules", ".git"])
+            
+        Returns:
+            Dict mapping each pattern to its sorted matching file paths
+        """
+        excluded_set = frozenset(exclude_dirs or ["node_modules", ".git", "__pycache__", "venv", ".venv"])
+        matches: Dict[str, List[str]] = {pattern: [] for pattern in patterns}
+        
+        # A leading "**/" means "at any depth", which is what matching against
+        # the end of the path already does (and PurePath.match can't express)
+        match_patterns = []
         for pattern in patterns:
-            for match in self.base_directory.rglob(pattern):
-                # Skip excluded directories
-                if any(excluded in match.parts for excluded in excluded_set):
-                    continue
-                    
-                # Only include safe files
-                if self._is_safe_path(match) and match.is_file():
-                    matches.append(str(match.relative_to(self.base_directory)))
-                    
-        return sorted(set(matches))
+            bare = pattern
+            while bare.startswith("**/"):
+                bare = bare[3:]
+            match_patterns.append((pattern, bare))
+        
+        for relative in self._file_index(excluded_set):
+            matching = [pattern for pattern, bare in match_patterns if relative.match(bare)]
+            
+            # Only include safe files
+            if matching and self._is_safe_path(self.base_directory / relative):
+                for pattern in matching:
+                    matches[pattern].append(str(relative))
+        
+        return {pattern: sorted(paths) for pattern, paths in matches.items()}
     
-    def read_multiple(self, file_paths: List[str]) -> List[FileContent]:
+    def _file_index(self, excluded: FrozenSet[str]) -> List[Path]:
+        """
+        List every file under base_directory, relative to it.
+        
+        The listing is reused for index_ttl seconds, so the several lookups
+        of one investigation (or a batch of them) walk the tree once. It is
+        rebuilt early if the base directory's own mtime changes.
+        
+        Args:
+            excluded: Directory names that are not descended into
+            
+        Returns:
+            Relative paths of all regular files outside excluded directories
+        """
+        try:
+            mtime = self.base_directory.stat().st_mtime
+        except OSError:
+            mtime = 0.0
+        now = time.monotonic()
+        
+        cached = self._index_cache.get(excluded)
+        if cached is not None and cached[1] == mtime and now - cached[0] < self.index_ttl:
+            return cached[2]
+        
+        files = []
+        for root, dirs, names in os.walk(self.base_directory):
+            # Prune excluded directories so they are never descended into
+            dirs[:] = [d for d in dirs if d not in excluded]
+            root_path = Path(root)
+            for name in names:
+                # Only regular files (or links to them): reading a FIFO or
+                # socket would block, and broken links can't be read at all
+                if os.path.isfile(os.path.join(root, name)):
+                    files.append((root_path / name).relative_to(self.base_directory))
+        
+        self._index_cache[excluded] = (now, mtime, files)
+        return files
+    
+    def read_multiple(self, file_paths: List[str], max_workers: int = 8) -> List[FileContent]:
         """
         Read multiple files and return their contents.
         
+        Files are read concurrently (reads are I/O-bound and independent);
+        results and warnings keep the order of file_paths.
+        
         Args:
             file_paths: List of file paths to read
+            max_workers: Maximum files read at once
             
         Returns:
             List of FileContent objects (skips files that can't be read)
         """
-        results = []
-        for path in file_paths:
+        def read(path: str):
             try:
-                content = self.read_file(path)
-                results.append(content)
+                return self.read_file(path), None
             except (ValueError, FileNotFoundError, IOError) as e:
+                return None, e
+        
+        if len(file_paths) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+                outcomes = list(executor.map(read, file_paths))
+        else:
+            outcomes = [read(path) for path in file_paths]
+        
+        results = []
+        for path, (content, error) in zip(file_paths, outcomes):
+            if error is not None:
                 # Log but continue with other files
-                print(f"Warning: Could not read {path}: {e}")
+                logger.warning("Could not read %s: %s", path, error)
+            else:
+                results.append(content)
                 
         return results
     
@@ -7,13 +7,27 @@ clean, relevant results without the noise of traditional search engines.
 """
 
 import os
-from typing import List, Dict, Optional
+import threading
+import time
+from typing import Any, List, Dict, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+# Process-wide Tavily clients, keyed by API key
+_CLIENT_CACHE: Dict[str, Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+# Retries after Tavily rejects a search for rate limiting, and the first
+# backoff delay in seconds (doubled on each retry)
+RATE_LIMIT_RETRIES = 2
+RATE_LIMIT_BACKOFF = 1.0
+
+
+@dataclass(frozen=True)
 class SearchResult:
     """Represents a single search result."""
+    __slots__ = ("title", "url", "content", "score")
+    
     title: str
     url: str
     content: str
@@ -49,13 +63,20 @@ class TavilySearchTool:
                     "Tavily API key not found. Set TAVILY_API_KEY environment variable "
                     "or pass api_key to constructor. Get a free key at https://tavily.com"
                 )
-            try:
-                from tavily import TavilyClient
-                self._client = TavilyClient(api_key=self.api_key)
-            except ImportError:
-                raise ImportError(
-                    "tavily-python package not installed. Run: pip install tavily-python"
-                )
+            # Instances with the same key share one client, so its pooled
+            # connections stay warm across tools and investigations
+            with _CLIENT_LOCK:
+                client = _CLIENT_CACHE.get(self.api_key)
+                if client is None:
+                    try:
+                        from tavily import TavilyClient
+                        client = TavilyClient(api_key=self.api_key)
+                    except ImportError:
+                        raise ImportError(
+                            "tavily-python package not installed. Run: pip install tavily-python"
+                        )
+                    _CLIENT_CACHE[self.api_key] = client
+            self._client = client
         return self._client
     
     def search(
@@ -93,8 +114,24 @@ class TavilySearchTool:
         if exclude_domains:
             search_params["exclude_domains"] = exclude_domains
             
-        # Execute search
-        response = client.search(**search_params)
+        # Execute search, backing off briefly if rate limited (parallel
+        # searches make an HTTP 429 more likely)
+        try:
+            from tavily.errors import UsageLimitExceededError
+            rate_limited = (UsageLimitExceededError,)
+        except ImportError:
+            rate_limited = ()
+        
+        delay = RATE_LIMIT_BACKOFF
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                response = client.search(**search_params)
+                break
+            except rate_limited:
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+                time.sleep(delay)
+                delay *= 2
         
         # Parse results
         results = []
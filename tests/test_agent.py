@@ -11,10 +11,49 @@ Test Coverage:
 - Security: path traversal and file access controls
 """
 
+import asyncio
+import json
+import os
+import sys
+import types
+from pathlib import Path
+
 import pytest
 from unittest.mock import MagicMock, patch
-from src.state import AgentState, create_initial_state
-from src.nodes import parse_llm_response, parse_json_response
+from src.cache import LFUCache
+from src.graph import IncidentResponder, clear_app_cache, create_incident_responder_graph, compile_graph
+from src import prompts
+from src.llm import BaseLLM, GeminiLLM
+import src.main
+from src.main import REPORT_KEYS, cached_investigate, read_error_log, report_filenames, write_jsonl_reports
+from src.state import AgentState, MAX_MESSAGES, append_messages, create_initial_state
+from src.nodes import (
+    NodeFactory,
+    SEARCH_RESULTS_BUDGET,
+    route_entry,
+    parse_llm_response,
+    parse_json_response,
+    check_solution_confidence,
+    should_continue_research,
+    iteration_budget,
+    diagnosis_cache_key,
+)
+from src.tools.file_tool import FileReaderTool
+from src.tools.search_tool import SearchResult
+
+
+class _FakeLLM:
+    """Minimal streaming LLM stand-in; generate_stream records its calls."""
+    
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.pulled = []  # chunks handed out so far
+        self.generate_stream = MagicMock(return_value=self._stream())
+    
+    def _stream(self):
+        for chunk in self._chunks:
+            self.pulled.append(chunk)
+            yield chunk
 
 
 class TestAgentState:
@@ -36,6 +75,17 @@ class TestAgentState:
         """Test custom max_iterations setting."""
         state = create_initial_state("error", max_iterations=5)
         assert state["max_iterations"] == 5
+    
+    def test_messages_reducer_keeps_recent_tail(self):
+        """Test that the messages log is bounded to its most recent entries."""
+        
+        log = []
+        for i in range(MAX_MESSAGES + 10):
+            log = append_messages(log, [f"msg {i}"])
+        
+        assert len(log) == MAX_MESSAGES
+        assert log[0] == "msg 10"
+        assert log[-1] == f"msg {MAX_MESSAGES + 9}"
 
 
 class TestJSONParsing:
@@ -91,13 +141,25 @@ Let me know if you need more details."""
         assert parsed["error_type"] == "configuration"
         assert len(parsed["search_keywords"]) == 2
         assert parsed["relevant_solutions"][0]["confidence"] == "high"
-    
+
+    def test_parse_json_with_braces_after_object(self):
+        """Test that braces in trailing prose or strings don't break parsing."""
+        response = '{"solution": "escape } and \\" in templates"}\nNote: close with `}`'
+        parsed = parse_json_response(response)
+
+        assert parsed == {"solution": 'escape } and " in templates'}
+
     def test_parse_invalid_json_returns_empty(self):
         """Test that invalid JSON returns an empty dict."""
         response = "This is not valid JSON at all"
         parsed = parse_json_response(response)
         
         assert parsed == {}
+    
+    def test_parse_json_from_bytes(self):
+        """Test that raw UTF-8 response bodies parse like text."""
+        assert parse_json_response(b'{"x": 1}') == {"x": 1}
+        assert parse_json_response(b'```json\n{"x": 1}\n```') == {"x": 1}
 
 
 class TestLLMResponseParsing:
@@ -147,13 +209,22 @@ SEVERITY: medium
         # Should strip brackets
         assert parsed["components"] == "database, redis, nginx"
 
+    def test_parse_value_ends_at_any_header(self):
+        """Test that values stop at unrequested headers, for ASCII and non-ASCII text."""
+        fields = ["ERROR_TYPE", "ERROR_SUMMARY"]
+        for summary in ["Connection failed", "Connexion échouée"]:
+            response = f"ERROR_TYPE: database\nSEVERITY: high\nERROR_SUMMARY: {summary}\n"
+            parsed = parse_llm_response(response, fields)
+
+            assert parsed["error_type"] == "database"
+            assert parsed["error_summary"] == summary
+
 
 class TestNodeLogic:
     """Tests for node decision logic."""
     
     def test_confidence_routing_low(self):
         """Test that low confidence routes to refinement."""
-        from src.nodes import check_solution_confidence
         
         state = create_initial_state("error")
         state["solution_confidence"] = 0.2
@@ -164,7 +235,6 @@ class TestNodeLogic:
         
     def test_confidence_routing_high(self):
         """Test that high confidence routes to end."""
-        from src.nodes import check_solution_confidence
         
         state = create_initial_state("error")
         state["solution_confidence"] = 0.8
@@ -175,7 +245,6 @@ class TestNodeLogic:
         
     def test_confidence_routing_approval(self):
         """Test that approval flag routes to approval node."""
-        from src.nodes import check_solution_confidence
         
         state = create_initial_state("error")
         state["solution_confidence"] = 0.9
@@ -186,7 +255,6 @@ class TestNodeLogic:
         
     def test_research_continues_when_needed(self):
         """Test research loop logic."""
-        from src.nodes import should_continue_research
         
         state = create_initial_state("error")
         state["status"] = "researching"
@@ -197,7 +265,6 @@ class TestNodeLogic:
         
     def test_research_stops_at_max(self):
         """Test research loop stops at max iterations."""
-        from src.nodes import should_continue_research
         
         state = create_initial_state("error", max_iterations=3)
         state["status"] = "researching"
@@ -206,52 +273,153 @@ class TestNodeLogic:
         result = should_continue_research(state)
         assert result == "audit"
 
+    def test_iteration_budget_scales_with_severity(self):
+        """Test minor incidents get fewer iterations, never more than requested."""
+        
+        assert iteration_budget("low", 3) == 1
+        assert iteration_budget("medium", 3) == 2
+        assert iteration_budget("high", 1) == 1
+        assert iteration_budget("high", 5) == 3
+        assert iteration_budget("critical", 5) == 5
+        assert iteration_budget("", 3) == 3
+        
+    def test_diagnosis_cache_key_covers_error_log_and_iteration_limit(self):
+        """Test that diagnosis caching keys on the error log and max_iterations."""
+        
+        state = create_initial_state("error")
+        progressed = create_initial_state("error")
+        progressed["iterations"] = 2
+        
+        assert diagnosis_cache_key(state) == diagnosis_cache_key(progressed)
+        assert diagnosis_cache_key(state) != diagnosis_cache_key(create_initial_state("other"))
+        # The node returns a budget derived from max_iterations, so a cached
+        # diagnosis must not be replayed for a different limit
+        assert diagnosis_cache_key(state) != diagnosis_cache_key(
+            create_initial_state("error", max_iterations=4)
+        )
+
+    def test_graph_without_human_approval(self):
+        """Test that disabling approval drops the node and still compiles."""
+
+        workflow = create_incident_responder_graph(
+            llm=MagicMock(),
+            search_tool=MagicMock(),
+            file_tool=MagicMock(),
+            verbose=False,
+            enable_human_approval=False
+        )
+
+        assert "human_approval" not in workflow.nodes
+        assert compile_graph(workflow) is not None
+
+    def test_patched_responder_is_not_reused(self):
+        """Test that an app built under patched constructors stays private to it."""
+
+        with patch('src.graph.get_llm'):
+            with patch('src.graph.TavilySearchTool'):
+                with patch('src.graph.FileReaderTool'):
+                    patched = IncidentResponder(verbose=False)
+        responder = IncidentResponder(verbose=False)
+
+        assert responder.llm is not patched.llm
+        assert isinstance(responder.llm, GeminiLLM)
+
+
+class TestResponseCache:
+    """Tests for the LFU response cache."""
+    
+    def test_evicts_least_frequently_used(self):
+        """Test that reused entries outlive one-off entries when the cache is full."""
+        
+        cache = LFUCache(2)
+        cache.put("recurring", "a")
+        cache.put("one_off", "b")
+        assert cache.get("recurring") == "a"
+        
+        cache.put("new", "c")
+        
+        assert cache.get("one_off") is None
+        assert cache.get("recurring") == "a"
+        assert cache.get("new") == "c"
+        assert len(cache) == 2
+
+
+@pytest.fixture(scope="class")
+def safe_tool():
+    """One read-only tool shared by the checks against the working directory."""
+    return FileReaderTool(base_directory=".")
+
+
+@pytest.fixture(scope="class")
+def safe_tool_app():
+    """One read-only tool rooted at /app for the traversal checks."""
+    return FileReaderTool(base_directory="/app")
+
 
 class TestToolSafety:
     """Tests for tool safety features (DevSecOps)."""
     
-    def test_file_tool_blocks_env_files(self):
+    def test_file_tool_blocks_env_files(self, safe_tool):
         """Test that .env files are blocked - prevents credential leakage."""
-        from src.tools.file_tool import FileReaderTool
-        
-        tool = FileReaderTool(base_directory=".")
         
         # Should not be safe
-        from pathlib import Path
-        assert not tool._is_safe_path(Path(".env"))
-        assert not tool._is_safe_path(Path("config/.env.local"))
+        assert not safe_tool._is_safe_path(Path(".env"))
+        assert not safe_tool._is_safe_path(Path("config/.env.local"))
         
-    def test_file_tool_blocks_secrets(self):
+    def test_file_tool_blocks_secrets(self, safe_tool):
         """Test that secret files are blocked."""
-        from src.tools.file_tool import FileReaderTool
-        
-        tool = FileReaderTool(base_directory=".")
         
-        from pathlib import Path
-        assert not tool._is_safe_path(Path("secrets/api_key.txt"))
-        assert not tool._is_safe_path(Path("credentials.json"))
+        assert not safe_tool._is_safe_path(Path("secrets/api_key.txt"))
+        assert not safe_tool._is_safe_path(Path("credentials.json"))
         
-    def test_file_tool_allows_code_files(self):
+    def test_file_tool_allows_code_files(self, safe_tool):
         """Test that code files are allowed."""
-        from src.tools.file_tool import FileReaderTool
-        
-        tool = FileReaderTool(base_directory=".")
         
         # Extension should be allowed
-        assert ".py" in tool.ALLOWED_EXTENSIONS
-        assert ".js" in tool.ALLOWED_EXTENSIONS
-        assert ".yml" in tool.ALLOWED_EXTENSIONS
+        assert ".py" in safe_tool.ALLOWED_EXTENSIONS
+        assert ".js" in safe_tool.ALLOWED_EXTENSIONS
+        assert ".yml" in safe_tool.ALLOWED_EXTENSIONS
     
-    def test_file_tool_blocks_path_traversal(self):
+    def test_file_tool_blocks_path_traversal(self, safe_tool_app):
         """Test that path traversal attacks are blocked."""
-        from src.tools.file_tool import FileReaderTool
-        
-        tool = FileReaderTool(base_directory="/app")
         
-        from pathlib import Path
         # Attempts to escape the base directory
-        assert not tool._is_safe_path(Path("../../../etc/passwd"))
-        assert not tool._is_safe_path(Path("/etc/passwd"))
+        assert not safe_tool_app._is_safe_path(Path("../../../etc/passwd"))
+        assert not safe_tool_app._is_safe_path(Path("/etc/passwd"))
+
+    def test_file_tool_reuses_directory_listing(self, tmp_path):
+        """Test that repeated lookups walk the tree once unless the TTL is 0."""
+
+        (tmp_path / "app").mkdir()
+        (tmp_path / "app" / "db.py").write_text("x = 1\n")
+
+        for index_ttl, expected_walks in [(30.0, 1), (0, 2)]:
+            tool = FileReaderTool(base_directory=str(tmp_path), index_ttl=index_ttl)
+            with patch("src.tools.file_tool.os.walk", wraps=os.walk) as walk:
+                assert tool.find_files(["*db*"]) == [os.path.join("app", "db.py")]
+                assert tool.find_files(["*.py"]) == [os.path.join("app", "db.py")]
+            assert walk.call_count == expected_walks
+
+    @pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="Needs POSIX FIFOs")
+    def test_file_index_lists_only_regular_files(self, tmp_path):
+        """Test that FIFOs and broken symlinks are never offered for reading."""
+        (tmp_path / "app.py").write_text("print('ok')")
+        os.mkfifo(tmp_path / "pipe.py")
+        (tmp_path / "broken.py").symlink_to(tmp_path / "missing.py")
+        tool = FileReaderTool(base_directory=str(tmp_path))
+        
+        assert tool.find_files_by_pattern(["*.py"]) == {"*.py": ["app.py"]}
+
+    def test_file_tool_caps_long_single_line_files(self, tmp_path):
+        """Test that a huge one-line file is truncated by size, not read whole."""
+
+        (tmp_path / "bundle.js").write_text("x" * 10_000)
+        tool = FileReaderTool(base_directory=str(tmp_path), max_chars=1000)
+
+        content = tool.read_file("bundle.js").content
+        assert content.startswith("x" * 1000)
+        assert "x" * 1001 not in content
+        assert "[Truncated at 1000 characters]" in content
 
 
 class TestNodesMocked:
@@ -264,7 +432,6 @@ class TestNodesMocked:
     
     def test_diagnostician_parses_json_response(self):
         """Test diagnostician node correctly parses LLM JSON output."""
-        from src.nodes import NodeFactory
         
         # Create a mock LLM
         mock_llm = MagicMock()
@@ -303,9 +470,228 @@ class TestNodesMocked:
         call_args = mock_llm.generate.call_args
         assert "connection refused" in call_args.kwargs.get("prompt", "")
     
+    def test_diagnose_batch_uses_one_call(self):
+        """Test batch diagnosis maps a JSON array back onto the input logs."""
+
+        mock_llm = MagicMock()
+        mock_llm.generate.return_value = '''<thinking>two items</thinking>
+        [
+            {"item": 1, "error_type": "database", "error_summary": "DB down"},
+            {"item": 2, "error_type": "network", "error_summary": "Upstream refused"}
+        ]'''
+
+        factory = NodeFactory(
+            llm=mock_llm,
+            search_tool=MagicMock(),
+            file_tool=MagicMock(),
+            verbose=False
+        )
+
+        results = factory.diagnose_batch(["db error", "nginx error"])
+
+        assert mock_llm.generate.call_count == 1
+        assert [r["error_type"] for r in results] == ["database", "network"]
+        assert all(r["status"] == "researching" for r in results)
+        prompt = mock_llm.generate.call_args.kwargs["prompt"]
+        assert "ITEM 1:" in prompt and "ITEM 2:" in prompt
+
+    def test_diagnose_batch_falls_back_per_item(self):
+        """Test a short batch answer falls back to one call per log."""
+
+        mock_llm = MagicMock()
+        mock_llm.generate.side_effect = [
+            '[{"item": 1, "error_type": "database"}]',
+            '{"error_type": "database", "error_summary": "DB down"}',
+            '{"error_type": "network", "error_summary": "Upstream refused"}',
+        ]
+
+        factory = NodeFactory(
+            llm=mock_llm,
+            search_tool=MagicMock(),
+            file_tool=MagicMock(),
+            verbose=False
+        )
+
+        results = factory.diagnose_batch(["db error", "nginx error"])
+
+        assert mock_llm.generate.call_count == 3
+        assert [r["error_type"] for r in results] == ["database", "network"]
+
+    def test_diagnose_batch_splits_batches_and_checks_order(self):
+        """Test logs are split by batch_size and reordered answers are rejected."""
+
+        mock_llm = MagicMock()
+        mock_llm.generate.side_effect = [
+            '[{"item": 1, "error_type": "database"}, {"item": 2, "error_type": "network"}]',
+            '[{"item": 2, "error_type": "network"}, {"item": 1, "error_type": "database"}]',
+            '{"error_type": "timeout"}',
+            '{"error_type": "permission"}',
+        ]
+
+        factory = NodeFactory(
+            llm=mock_llm,
+            search_tool=MagicMock(),
+            file_tool=MagicMock(),
+            verbose=False
+        )
+
+        results = factory.diagnose_batch(["a", "b", "c", "d"], batch_size=2)
+
+        assert mock_llm.generate.call_count == 4
+        assert [r["error_type"] for r in results] == ["database", "network", "timeout", "permission"]
+
+    def test_repeated_prompt_reuses_llm_response(self):
+        """Test identical prompts hit the LLM once unless caching is off."""
+
+        for llm_cache, expected_calls in [(True, 1), (False, 2)]:
+            mock_llm = MagicMock()
+            mock_llm.generate.return_value = '{"error_type": "database"}'
+            factory = NodeFactory(
+                llm=mock_llm,
+                search_tool=MagicMock(),
+                file_tool=MagicMock(),
+                verbose=False,
+                llm_cache=llm_cache
+            )
+
+            state = create_initial_state("psycopg2.OperationalError")
+            first = factory.diagnostician(state)
+            second = factory.diagnostician(state)
+
+            assert first == second
+            assert mock_llm.generate.call_count == expected_calls
+
+    def test_repeated_search_query_reuses_results(self):
+        """Test a query repeated at the same research pass is searched once."""
+
+        mock_search = MagicMock()
+        mock_search.search_technical.return_value = []
+        mock_llm = MagicMock()
+        mock_llm.generate.return_value = '{"needs_more_research": false}'
+        factory = NodeFactory(
+            llm=mock_llm,
+            search_tool=mock_search,
+            file_tool=MagicMock(),
+            verbose=False
+        )
+
+        state = create_initial_state("error")
+        state["search_queries"] = ["Connection refused postgres"]
+        factory.webscraper(state)
+        state["search_queries"] = ["connection refused postgres"]
+        factory.webscraper(state)
+
+        assert mock_search.search_technical.call_count == 1
+
+    def test_refinement_pass_reuses_search_but_asks_llm_again(self):
+        """Test a later pass is served repeated searches but re-asks the LLM."""
+
+        mock_search = MagicMock()
+        mock_search.search_technical.return_value = []
+        mock_llm = MagicMock()
+        mock_llm.generate.return_value = '{"confidence_score": 0.1}'
+        factory = NodeFactory(
+            llm=mock_llm,
+            search_tool=mock_search,
+            file_tool=MagicMock(),
+            verbose=False
+        )
+
+        state = create_initial_state("error")
+        state["search_queries"] = ["connection refused postgres"]
+        factory.webscraper(state)
+        factory.solver(state)
+        state["iterations"] = 1
+        factory.webscraper(state)
+        factory.solver(state)
+
+        assert mock_search.search_technical.call_count == 1
+        assert mock_llm.generate.call_count == 4
+
+    def test_search_results_stop_at_total_budget(self):
+        """Test no query's results are added once the total budget is spent."""
+
+        def search_technical(query, max_results=5):
+            if query == "long":
+                # More full-length results than the whole budget holds
+                return [
+                    SearchResult(title=f"Long {i}", url=f"https://example.com/{i}",
+                                 content="x" * 2000, score=0.5)
+                    for i in range(40)
+                ]
+            return [SearchResult(title="Tiny", url=f"https://example.com/{query}",
+                                 content="tiny", score=0.5)]
+
+        mock_search = MagicMock()
+        mock_search.search_technical.side_effect = search_technical
+        mock_llm = MagicMock()
+        mock_llm.generate.return_value = '{"needs_more_research": false}'
+        factory = NodeFactory(
+            llm=mock_llm,
+            search_tool=mock_search,
+            file_tool=MagicMock(),
+            verbose=False
+        )
+
+        state = create_initial_state("error")
+        state["search_queries"] = ["long", "short one", "short two"]
+        results_text = factory.webscraper(state)["relevant_docs"][0]
+
+        entries = results_text.split("\n\n---\n\n")
+        assert sum(len(entry) for entry in entries) <= SEARCH_RESULTS_BUDGET
+        assert "Tiny" not in results_text
+
+    def test_confident_findings_end_research(self):
+        """Test confident findings stop the loop even when a refinement is offered."""
+
+        mock_search = MagicMock()
+        mock_search.search_technical.return_value = []
+        mock_llm = MagicMock()
+        mock_llm.generate.return_value = """{
+            "needs_more_research": true,
+            "refined_query": "postgres max_connections docker",
+            "overall_confidence": "high"
+        }"""
+        factory = NodeFactory(
+            llm=mock_llm,
+            search_tool=mock_search,
+            file_tool=MagicMock(),
+            verbose=False
+        )
+
+        state = create_initial_state("error")
+        state["search_queries"] = ["connection refused postgres"]
+        state["status"] = "researching"
+        result = factory.webscraper(state)
+        state.update(result)
+
+        assert result["status"] == "auditing"
+        assert "search_queries" not in result
+        assert should_continue_research(state) == "audit"
+        assert mock_search.search_technical.call_count == 1
+
+    def test_code_collector_prefers_exact_file_names(self, tmp_path):
+        """Test an exact file name is read before files that merely contain it."""
+        for name in ("a/test_config.py", "b/my_config.py", "z/config.py"):
+            (tmp_path / name).parent.mkdir()
+            (tmp_path / name).write_text(f"# {name}\n")
+        factory = NodeFactory(
+            llm=MagicMock(),
+            search_tool=MagicMock(),
+            file_tool=FileReaderTool(base_directory=str(tmp_path)),
+            verbose=False
+        )
+        
+        state = create_initial_state("error")
+        state["files_to_check"] = ["config.py"]
+        code_files = factory.code_collector(state)["code_files"]
+        
+        assert "# z/config.py" in code_files
+        assert "# a/test_config.py" in code_files
+        assert "# b/my_config.py" not in code_files
+
     def test_diagnostician_handles_malformed_json(self):
         """Test diagnostician gracefully handles malformed LLM output."""
-        from src.nodes import NodeFactory
         
         # LLM returns garbage
         mock_llm = MagicMock()
@@ -325,9 +711,27 @@ class TestNodesMocked:
         assert result["error_type"] == "database"
         assert "Connection failed" in result["error_summary"]
     
+    def test_legacy_file_list_keeps_interior_apostrophes(self):
+        """Test only quotes around each legacy file name are stripped."""
+        
+        mock_llm = MagicMock()
+        mock_llm.generate.return_value = (
+            "ERROR_TYPE: code\n"
+            "FILES_TO_CHECK: \"config.py\", 'O'Reilly.py', don't_panic.py"
+        )
+        factory = NodeFactory(
+            llm=mock_llm,
+            search_tool=MagicMock(),
+            file_tool=MagicMock(),
+            verbose=False
+        )
+        
+        result = factory.diagnostician(create_initial_state("Some error"))
+        
+        assert result["files_to_check"] == ["config.py", "O'Reilly.py", "don't_panic.py"]
+    
     def test_solver_extracts_confidence_score(self):
         """Test solver correctly extracts confidence from JSON."""
-        from src.nodes import NodeFactory
         
         mock_llm = MagicMock()
         mock_llm.generate.return_value = '''{
@@ -364,7 +768,6 @@ class TestNodesMocked:
     
     def test_solver_flags_dangerous_operations(self):
         """Test solver correctly flags operations needing approval."""
-        from src.nodes import NodeFactory
         
         mock_llm = MagicMock()
         mock_llm.generate.return_value = '''{
@@ -401,12 +804,129 @@ class TestNodesMocked:
         assert "Destructive" in result["pending_action"]
 
 
+# Canned replies for each node, keyed by the node's system prompt
+_NODE_REPLIES = {
+    prompts.DIAGNOSTICIAN_SYSTEM: """{
+        "error_type": "configuration",
+        "severity": "high",
+        "error_summary": "Database URL missing",
+        "search_keywords": ["DATABASE_URL not set"],
+        "files_to_check": ["settings.py"]
+    }""",
+    prompts.WEBSCRAPER_SYSTEM: '{"needs_more_research": false, "overall_confidence": "high"}',
+    prompts.CODE_AUDITOR_SYSTEM: "settings.py reads DATABASE_URL without a default.",
+    prompts.SOLVER_SYSTEM: '{"confidence_score": 0.9, "solution_summary": "Set DATABASE_URL"}',
+}
+
+
+@pytest.fixture
+def stubbed_responder(tmp_path):
+    """A responder running the real graph on a stub LLM, stub search and a temp tree."""
+    (tmp_path / "settings.py").write_text("DATABASE_URL = os.environ['DATABASE_URL']\n")
+    llm = MagicMock()
+    llm.model = "stub"
+    llm.generate.side_effect = lambda prompt, system_prompt=None: _NODE_REPLIES[system_prompt]
+    search_tool = MagicMock()
+    search_tool.search_technical.return_value = [
+        SearchResult(title="Env vars", url="https://example.com/env", content="Set it", score=0.9)
+    ]
+    
+    clear_app_cache()
+    with patch('src.graph.get_llm', return_value=llm):
+        with patch('src.graph.TavilySearchTool', return_value=search_tool):
+            with patch('src.graph.FileReaderTool', return_value=FileReaderTool(str(tmp_path))):
+                yield IncidentResponder(verbose=False, enable_human_approval=False)
+    clear_app_cache()
+
+
+class TestGraphWorkflow:
+    """End-to-end runs of the compiled graph with stubbed dependencies."""
+    
+    @staticmethod
+    def _stream(responder, state):
+        """Run the graph from state, returning (node names in order, raw events)."""
+        async def collect():
+            return [event async for event in responder.app.astream(state, stream_mode="updates")]
+        events = asyncio.run(collect())
+        names = [name for event in events for name in event if not name.startswith("__")]
+        return names, events
+    
+    def test_nodes_run_in_topology_order(self, stubbed_responder):
+        """Test diagnose fans out to research and code collection, then audit and solve."""
+        
+        async def collect():
+            return [name async for name, _ in stubbed_responder.ainvestigate_stream("KeyError: 'DATABASE_URL'")]
+        names = asyncio.run(collect())
+        
+        assert names[0] == "diagnose"
+        assert set(names[1:3]) == {"research", "collect_code"}
+        assert names[3:] == ["audit", "solve"]
+    
+    def test_collected_code_reaches_auditor(self, stubbed_responder):
+        """Test the files read by the collector are in the auditor's prompt."""
+        
+        stubbed_responder.investigate("KeyError: 'DATABASE_URL'")
+        
+        audit_prompts = [
+            call.kwargs["prompt"] for call in stubbed_responder.llm.generate.call_args_list
+            if call.kwargs["system_prompt"] == prompts.CODE_AUDITOR_SYSTEM
+        ]
+        assert len(audit_prompts) == 1
+        assert "DATABASE_URL = os.environ['DATABASE_URL']" in audit_prompts[0]
+    
+    def test_diagnosed_state_skips_diagnose(self, stubbed_responder):
+        """Test a state that is no longer investigating enters at research and collection."""
+        state = create_initial_state("KeyError: 'DATABASE_URL'")
+        state.update(
+            error_type="configuration",
+            error_summary="Database URL missing",
+            search_queries=["DATABASE_URL not set"],
+            files_to_check=["settings.py"],
+            status="researching",
+        )
+        
+        assert route_entry(state) == ["research", "collect_code"]
+        names, _ = self._stream(stubbed_responder, state)
+        
+        assert "diagnose" not in names
+        assert set(names[:2]) == {"research", "collect_code"}
+        assert names[2:] == ["audit", "solve"]
+    
+    def test_identical_run_is_served_from_cache(self, stubbed_responder):
+        """Test a repeat run replays cached nodes without calling the LLM."""
+        state = create_initial_state("KeyError: 'DATABASE_URL'")
+        first_names, _ = self._stream(stubbed_responder, state)
+        calls = stubbed_responder.llm.generate.call_count
+        
+        names, events = self._stream(stubbed_responder, state)
+        
+        assert stubbed_responder.llm.generate.call_count == calls
+        assert sorted(names) == sorted(first_names)
+        cached = {
+            name for event in events if event.get("__metadata__", {}).get("cached")
+            for name in event if not name.startswith("__")
+        }
+        assert {"diagnose", "audit"} <= cached
+
+
+@pytest.fixture(scope="class")
+def responder():
+    """One IncidentResponder, built with its providers patched out, per class."""
+    # Start and finish with an empty app cache so the patched build is never
+    # shared with responders built by other tests
+    clear_app_cache()
+    with patch('src.graph.get_llm'):
+        with patch('src.graph.TavilySearchTool'):
+            with patch('src.graph.FileReaderTool'):
+                yield IncidentResponder(verbose=False)
+    clear_app_cache()
+
+
 class TestStreaming:
     """Tests for streaming LLM output."""
     
     def test_llm_has_generate_stream_method(self):
         """Test that LLM class has streaming capability."""
-        from src.llm import GeminiLLM
         
         llm = GeminiLLM(api_key="test_key")
         assert hasattr(llm, 'generate_stream')
@@ -414,28 +934,31 @@ class TestStreaming:
     
     def test_base_llm_requires_stream_method(self):
         """Test that BaseLLM abstract class requires generate_stream."""
-        from src.llm import BaseLLM
-        import inspect
         
         # Check that generate_stream is an abstract method
         assert 'generate_stream' in BaseLLM.__abstractmethods__
     
-    def test_generate_solution_explanation_yields_chunks(self):
-        """Test that the generator actually yields data chunk by chunk."""
-        from src.graph import IncidentResponder
-        from src.llm import GeminiLLM
+    def test_base_llm_async_stream_falls_back_to_sync_stream(self):
+        """Test that providers without an async client still stream asynchronously."""
         
-        # Setup mock LLM
-        mock_llm = MagicMock(spec=GeminiLLM)
-        fake_stream = iter(["Checking ", "database ", "connection..."])
-        mock_llm.generate_stream.return_value = fake_stream
+        class StubLLM(BaseLLM):
+            def generate(self, prompt, system_prompt=None):
+                return prompt
+            
+            def generate_stream(self, prompt, system_prompt=None):
+                yield from ["Checking ", "database"]
         
-        # Create responder and inject mock
-        with patch('src.graph.get_llm', return_value=mock_llm):
-            with patch('src.graph.TavilySearchTool'):
-                with patch('src.graph.FileReaderTool'):
-                    responder = IncidentResponder(verbose=False)
-                    responder.llm = mock_llm
+        async def collect():
+            return [chunk async for chunk in StubLLM().agenerate_stream("prompt")]
+        
+        assert asyncio.run(collect()) == ["Checking ", "database"]
+    
+    def test_generate_solution_explanation_yields_chunks(self, responder):
+        """Test that the generator actually yields data chunk by chunk."""
+        
+        # Inject mock LLM
+        mock_llm = _FakeLLM(["Checking ", "database ", "connection..."])
+        responder.llm = mock_llm
         
         # Create minimal state
         state = create_initial_state("test error")
@@ -444,13 +967,14 @@ class TestStreaming:
         state["proposed_solution"] = "Restart database"
         state["solution_steps"] = ["Step 1", "Step 2"]
         
-        # Call the generator and collect results
+        # Each chunk is relayed as soon as it arrives, with no read-ahead
         generator = responder.generate_solution_explanation(state)
-        results = list(generator)
+        assert next(generator) == "Checking "
+        assert mock_llm.pulled == ["Checking "]
         
-        # Assert chunks were yielded correctly
-        assert results == ["Checking ", "database ", "connection..."]
-        assert len(results) == 3
+        # The rest follow in order
+        assert list(generator) == ["database ", "connection..."]
+        assert mock_llm.pulled == ["Checking ", "database ", "connection..."]
         
         # Verify LLM was called with correct error context
         call_args = mock_llm.generate_stream.call_args
@@ -458,20 +982,79 @@ class TestStreaming:
         assert "database" in prompt
         assert "Connection failed" in prompt
     
-    def test_generate_solution_explanation_is_generator(self):
-        """Test that the method returns a generator, not a list."""
-        from src.graph import IncidentResponder
-        from src.llm import GeminiLLM
-        import types
+    def test_agenerate_solution_explanation_yields_chunks(self, responder):
+        """Test that the async generator relays every chunk in order."""
+        
+        async def fake_stream(prompt, system_prompt=None):
+            for chunk in ["Checking ", "database ", "connection..."]:
+                yield chunk
         
         mock_llm = MagicMock(spec=GeminiLLM)
-        mock_llm.generate_stream.return_value = iter(["chunk"])
+        mock_llm.agenerate_stream = fake_stream
+        responder.llm = mock_llm
+        
+        state = create_initial_state("test error")
+        state["error_type"] = "database"
+        
+        async def collect():
+            # A tiny buffer forces the producer to wait on the consumer
+            generator = responder.agenerate_solution_explanation(state, buffer_size=1)
+            return [chunk async for chunk in generator]
+        
+        assert asyncio.run(collect()) == ["Checking ", "database ", "connection..."]
+
+    def test_agenerate_solution_explanation_stops_producer_on_early_exit(self, responder):
+        """Test that a consumer stopping early leaves no pending producer task."""
         
-        with patch('src.graph.get_llm', return_value=mock_llm):
+        async def endless_stream(prompt, system_prompt=None):
+            while True:
+                yield "chunk"
+        
+        mock_llm = MagicMock(spec=GeminiLLM)
+        mock_llm.agenerate_stream = endless_stream
+        responder.llm = mock_llm
+        
+        async def consume_one():
+            generator = responder.agenerate_solution_explanation(
+                create_initial_state("error"), buffer_size=1
+            )
+            first = await generator.__anext__()
+            await generator.aclose()
+            # all_tasks() only lists tasks that have not finished
+            pending = [
+                task for task in asyncio.all_tasks()
+                if getattr(task.get_coro(), "__name__", "") == "produce"
+            ]
+            return first, pending
+        
+        assert asyncio.run(consume_one()) == ("chunk", [])
+
+    def test_ainvestigate_stream_yields_node_updates(self):
+        """Test that per-node updates are relayed and bookkeeping is skipped."""
+
+        async def fake_astream(state, stream_mode=None):
+            yield {"diagnose": {"error_type": "database"}}
+            yield {"audit": {"status": "solving"}, "__metadata__": {"cached": True}}
+
+        with patch('src.graph.get_llm'):
             with patch('src.graph.TavilySearchTool'):
                 with patch('src.graph.FileReaderTool'):
                     responder = IncidentResponder(verbose=False)
-                    responder.llm = mock_llm
+        responder.app = MagicMock()
+        responder.app.astream = fake_astream
+
+        async def collect():
+            return [event async for event in responder.ainvestigate_stream("error")]
+
+        assert asyncio.run(collect()) == [
+            ("diagnose", {"error_type": "database"}),
+            ("audit", {"status": "solving"}),
+        ]
+
+    def test_generate_solution_explanation_is_generator(self, responder):
+        """Test that the method returns a generator, not a list."""
+        
+        responder.llm = _FakeLLM(["chunk"])
         
         state = create_initial_state("error")
         state["error_type"] = "test"
@@ -482,14 +1065,199 @@ class TestStreaming:
         assert isinstance(result, types.GeneratorType)
 
 
-# Integration test (requires API keys)
-@pytest.mark.skipif(True, reason="Requires API keys - run manually with: pytest tests/ -v -k Integration")
+def _fake_responder(model="gemini-2.5-flash-lite", base_directory="/srv/app"):
+    """A responder stand-in whose investigations echo the log back."""
+    responder = MagicMock()
+    responder.verbose = False
+    responder.llm.model = model
+    responder.file_tool.base_directory = Path(base_directory)
+    responder.investigate.side_effect = lambda error_log, max_iterations=3: {
+        "error_log": error_log,
+        "error_type": "database",
+    }
+    return responder
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the investigation cache at an empty temporary directory."""
+    monkeypatch.setattr(src.main, "CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "cache"
+
+
+class TestInvestigationCache:
+    """Tests for the on-disk investigation cache used by the CLI."""
+    
+    def test_hit_skips_the_responder(self, cache_dir):
+        """Test that a repeat investigation is served from disk."""
+        responder = _fake_responder()
+        
+        first = cached_investigate(responder, "ConnectionRefusedError")
+        second = cached_investigate(responder, "ConnectionRefusedError")
+        
+        assert responder.investigate.call_count == 1
+        assert second == first
+    
+    def test_expired_entry_is_a_miss(self, cache_dir):
+        """Test that entries older than CACHE_TTL are investigated again."""
+        responder = _fake_responder()
+        cached_investigate(responder, "ConnectionRefusedError")
+        for entry in cache_dir.iterdir():
+            os.utime(entry, (0, 0))
+        
+        cached_investigate(responder, "ConnectionRefusedError")
+        
+        assert responder.investigate.call_count == 2
+    
+    def test_volatile_details_share_a_key(self, cache_dir):
+        """Test that logs differing only in timestamps and addresses share an entry."""
+        responder = _fake_responder()
+        
+        cached_investigate(responder, "2024-01-01 10:00:00 segfault at 0x7f3a2b")
+        result = cached_investigate(responder, "2024-02-02 11:30:00 segfault at 0x55aa01")
+        
+        assert responder.investigate.call_count == 1
+        # The report still shows the log that was asked about
+        assert result["error_log"] == "2024-02-02 11:30:00 segfault at 0x55aa01"
+    
+    def test_configuration_is_part_of_the_key(self, cache_dir):
+        """Test that model, max_iterations and base directory each get their own entry."""
+        cached_investigate(_fake_responder(), "error")
+        
+        for responder, max_iterations in [
+            (_fake_responder(model="gemini-2.5-pro"), 3),
+            (_fake_responder(), 5),
+            (_fake_responder(base_directory="/srv/other"), 3),
+        ]:
+            cached_investigate(responder, "error", max_iterations=max_iterations)
+            assert responder.investigate.call_count == 1
+        
+        assert len(list(cache_dir.glob("*.json"))) == 4
+    
+    def test_corrupt_entry_is_a_miss(self, cache_dir):
+        """Test that a partially written entry is investigated again and replaced."""
+        responder = _fake_responder()
+        cached_investigate(responder, "error")
+        (entry,) = cache_dir.glob("*.json")
+        entry.write_text('{"error_type": "datab')
+        
+        result = cached_investigate(responder, "error")
+        
+        assert responder.investigate.call_count == 2
+        assert result["error_type"] == "database"
+        assert list(cache_dir.glob("*.tmp")) == []
+    
+    def test_no_cache_flag_bypasses_the_cache(self, cache_dir, monkeypatch):
+        """Test that --no-cache investigates without reading or writing entries."""
+        responder = _fake_responder()
+        monkeypatch.setattr(sys, "argv", ["devir", "--error", "error", "--no-cache", "--quiet"])
+        
+        with patch("src.graph.IncidentResponder", return_value=responder):
+            src.main.main()
+            src.main.main()
+        
+        assert responder.investigate.call_count == 2
+        assert not cache_dir.exists()
+
+
+class TestCommandLine:
+    """Tests for the command line helpers in src.main."""
+    
+    def test_read_error_log_reads_whole_file_by_default(self, tmp_path):
+        """Test that logs are not truncated unless a limit is given."""
+        log = tmp_path / "error.log"
+        log.write_bytes(b"root cause\n" + b"x" * (128 * 1024))
+        
+        assert read_error_log(str(log)).startswith("root cause\n")
+    
+    def test_read_error_log_keeps_file_of_exactly_max_bytes(self, tmp_path, capsys):
+        """Test that a log of exactly max_bytes is returned unmarked."""
+        log = tmp_path / "error.log"
+        log.write_bytes(b"EAD\nabcdefghijk\n")
+        
+        assert read_error_log(str(log), max_bytes=16) == "EAD\nabcdefghijk\n"
+        assert capsys.readouterr().out == ""
+    
+    def test_read_error_log_marks_and_warns_on_truncation(self, tmp_path, capsys):
+        """Test that one byte over max_bytes drops the partial line and marks the cut."""
+        log = tmp_path / "error.log"
+        log.write_bytes(b"HEAD\nabcdefghijk\n")
+        
+        text = read_error_log(str(log), max_bytes=16)
+        
+        assert text == "[... 5 earlier bytes truncated ...]\nabcdefghijk\n"
+        assert "Warning:" in capsys.readouterr().out
+    
+    def test_report_filenames_keep_same_named_logs_apart(self, tmp_path):
+        """Test that logs sharing a basename in different directories get distinct reports."""
+        paths = [str(tmp_path / "svc-a" / "error.log"), str(tmp_path / "svc-b" / "error.log")]
+        
+        assert report_filenames(paths) == [
+            "incident_report_svc-a_error.md",
+            "incident_report_svc-b_error.md",
+        ]
+    
+    def test_single_file_glob_saves_one_report(self, tmp_path, monkeypatch):
+        """Test that a glob matching one log saves one report named after it."""
+        (tmp_path / "logs").mkdir()
+        (tmp_path / "logs" / "api.log").write_text("ConnectionRefusedError")
+        responder = _fake_responder()
+        responder.investigate_many.return_value = [
+            {"error_log": "ConnectionRefusedError", "error_type": "network"}
+        ]
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(sys, "argv", ["devir", "--file", "logs/*.log", "--quiet"])
+        
+        with patch("src.graph.IncidentResponder", return_value=responder):
+            src.main.main()
+        
+        assert sorted(p.name for p in tmp_path.glob("*.md")) == ["incident_report_api.md"]
+        assert "ConnectionRefusedError" in (tmp_path / "incident_report_api.md").read_text()
+    
+    def test_batch_samples_save_reports_under_output_directory(self, tmp_path, monkeypatch):
+        """Test that --batch-samples treats --output as the report directory."""
+        samples = src.main.get_sample_errors()
+        responder = _fake_responder()
+        responder.investigate_batch.return_value = [
+            {"error_log": sample["error"]} for sample in samples.values()
+        ]
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(
+            sys, "argv", ["devir", "--batch-samples", "--output", "reports", "--quiet"]
+        )
+        
+        with patch("src.graph.IncidentResponder", return_value=responder):
+            src.main.main()
+        
+        assert list(tmp_path.glob("*.md")) == []
+        assert sorted(p.name for p in (tmp_path / "reports").iterdir()) == sorted(
+            f"incident_report_sample_{key}.md" for key in samples
+        )
+    
+    def test_jsonl_reports_append_one_line_per_incident(self, tmp_path):
+        """Test that every investigation becomes one JSON line with the report fields."""
+        sink = tmp_path / "reports.jsonl"
+        states = [
+            create_initial_state("first error"),
+            create_initial_state("second error"),
+        ]
+        
+        write_jsonl_reports(states, str(sink))
+        write_jsonl_reports(states[:1], str(sink))
+        
+        lines = [json.loads(line) for line in sink.read_text().splitlines()]
+        assert [line["error_log"] for line in lines] == ["first error", "second error", "first error"]
+        assert all(set(line) == set(REPORT_KEYS) for line in lines)
+
+
+# Integration test (requires API keys) - deselected by default, run manually
+# with: pytest tests/ -v -m integration
+@pytest.mark.integration
 class TestIntegration:
     """Integration tests that require real API calls."""
     
     def test_full_workflow(self):
         """Test complete agent workflow."""
-        from src.graph import IncidentResponder
         
         responder = IncidentResponder(verbose=False)
         result = responder.investigate(